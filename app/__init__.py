@@ -0,0 +1,83 @@
+"""Business manager: entities and their relationships, transactions, work logs and supplies.
+
+The app is built by create_app(); the flask CLI finds it by itself and
+gunicorn serves "app:create_app()". Models live in app.models, shared
+logic in app.core, and each blueprint in its own module: views (the HTML
+pages), api_v1, reports, jobs, exports and commands (the CLI).
+"""
+import os
+
+from flask import Flask, before_render_template, template_rendered
+
+from app import api_v1, commands, exports, jobs, reports, views
+from app.core.caches import REFERENCE_MODELS, ReferenceCache, SummaryCache
+from app.core.database import configure_sqlite_engine, db, migrate, sqlite_engine_options
+from app.core.lists import page_url
+from app.core.metrics import (
+    REQUEST_DURATION_BUCKETS, RequestMetrics, instrument_engine, record_request_metrics, record_template_time,
+    start_request_metrics, start_template_timer,
+)
+from app.core.versions import code_version, track_table_writes
+
+BLUEPRINTS = (views.bp, api_v1.bp, reports.bp, jobs.bp, exports.bp, commands.bp)
+
+
+def env_config():
+    """Settings read from the environment; create_app(config) overrides any of them."""
+    env = os.environ.get
+    return {
+        "SQLALCHEMY_DATABASE_URI": env("DATABASE_URL", "sqlite:///entities.db"),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "SQLITE_PROFILE": env("SQLITE_PROFILE", "production"),
+        "DASHBOARD_CACHE_SIZE": int(env("DASHBOARD_CACHE_SIZE", 256)),
+        "DASHBOARD_CACHE_TTL": float(env("DASHBOARD_CACHE_TTL", 300)),  # seconds
+        "REFERENCE_CACHE_TTL": float(env("REFERENCE_CACHE_TTL", 60)),  # seconds; bounds staleness across worker processes
+        "JOB_WORKERS": int(env("JOB_WORKERS", 2)),  # 0 runs jobs inline
+        "JOB_STALE_AFTER": float(env("JOB_STALE_AFTER", 3600)),  # seconds queued/running before a job counts as abandoned
+        "CASCADE_DELETE_CHUNK": int(env("CASCADE_DELETE_CHUNK", 500)),  # rows per delete transaction
+        "CASCADE_DELETE_PAUSE": float(env("CASCADE_DELETE_PAUSE", 0.01)),  # seconds between chunks, so queued writers get the lock
+        "SLOW_QUERY_MS": float(env("SLOW_QUERY_MS", 200)),
+        "ETAG_SALT": env("ETAG_SALT"),  # defaults to code_version()
+    }
+
+
+def create_app(config=None):
+    """Build the app from env_config(), with `config` overriding any setting.
+
+    Importing this package and calling create_app touch no database:
+    engines connect on first use, so each worker starts quickly and tests
+    can pass their own SQLALCHEMY_DATABASE_URI. Caches, request metrics and
+    the job thread pool are made here and kept in app.extensions, so every
+    app has its own, sized by its own config.
+    """
+    app = Flask(__name__)
+    app.config.update(env_config())
+    app.config.update(config or {})
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", sqlite_engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"], app.config["SQLITE_PROFILE"]
+    ))
+    if not app.config["ETAG_SALT"]:
+        app.config["ETAG_SALT"] = code_version(app)
+
+    db.init_app(app)
+    migrate.init_app(app, db)
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
+    app.add_template_global(page_url)
+
+    app.extensions["reference_data"] = ReferenceCache(REFERENCE_MODELS, ttl=app.config["REFERENCE_CACHE_TTL"])
+    app.extensions["dashboard_cache"] = SummaryCache(
+        maxsize=app.config["DASHBOARD_CACHE_SIZE"], ttl=app.config["DASHBOARD_CACHE_TTL"]
+    )
+    app.extensions["request_metrics"] = metrics = RequestMetrics(REQUEST_DURATION_BUCKETS)
+    jobs.init_job_executor(app)
+
+    app.before_request(start_request_metrics)
+    app.after_request(record_request_metrics)
+    before_render_template.connect(start_template_timer, app)
+    template_rendered.connect(record_template_time, app)
+    with app.app_context():
+        configure_sqlite_engine(db.engine, app.config["SQLITE_PROFILE"])
+        instrument_engine(db.engine, app.config["SLOW_QUERY_MS"], metrics)
+        track_table_writes(db.engine)
+    return app
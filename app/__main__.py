@@ -0,0 +1,10 @@
+"""Development server with a throwaway schema: python -m app"""
+from app import create_app
+from app.core.database import db
+from app.core.seed import seed_defaults
+
+app = create_app()
+with app.app_context():
+    db.create_all()
+    seed_defaults()
+app.run(debug=True)
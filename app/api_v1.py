@@ -0,0 +1,497 @@
+"""The JSON API.
+
+Read endpoints answer under both /api/... and /api/v1/...; the batch
+create and supply payment endpoints are /api/v1 only.
+"""
+from datetime import datetime
+
+from flask import Blueprint, abort, jsonify, request
+from sqlalchemy import and_, text
+from sqlalchemy.orm import joinedload
+
+from app.core.caches import dashboard_cache, reference_data, work_type_rates
+from app.core.database import db
+from app.core.lists import (
+    MAX_PAGE_SIZE, date_arg, entity_page, entity_to_dict, int_arg, page_json, relationship_label, relationship_page,
+    relationship_to_dict, supply_log_page, supply_log_to_dict, transaction_page, transaction_to_dict, worklog_page,
+    worklog_to_dict,
+)
+from app.core.payments import SupplyPaymentError, payable_supply_log_count, run_supply_payments
+from app.core.rollups import amounts_owed, record_core_insert, supply_type_totals, supply_type_tree_rows
+from app.core.search import SEARCH_INDEXES, fts_match
+from app.core.versions import conditional_get
+from app.models import Entity, Relationship, RelationshipType, SupplyLog, SupplyType, Transaction, TransactionType, WorkLog
+
+bp = Blueprint("api_v1", __name__)
+
+
+# --- List reads ---
+@bp.route("/api/entities")
+@bp.route("/api/v1/entities")
+def api_entities():
+    return page_json(*entity_page(), entity_to_dict)
+
+
+@bp.route("/api/relationships")
+@bp.route("/api/v1/relationships")
+def api_relationships():
+    return page_json(*relationship_page(), relationship_to_dict)
+
+
+@bp.route("/api/transactions")
+@bp.route("/api/v1/transactions")
+def api_transactions():
+    return page_json(*transaction_page(), transaction_to_dict)
+
+
+@bp.route("/api/worklogs")
+@bp.route("/api/v1/worklogs")
+def api_worklogs():
+    return page_json(*worklog_page(), worklog_to_dict)
+
+
+@bp.route("/api/supply_logs")
+@bp.route("/api/v1/supply_logs")
+def api_supply_logs():
+    return page_json(*supply_log_page(), supply_log_to_dict)
+
+
+# --- Balances, summaries and unpaid logs ---
+@bp.route("/api/amounts_owed")
+@bp.route("/api/v1/amounts_owed")
+def api_amounts_owed():
+    return jsonify({"items": amounts_owed(int_arg("type_id"))})
+
+
+@bp.route("/api/dashboard_cache")
+def api_dashboard_cache():
+    return jsonify(dashboard_cache.stats())
+
+
+@bp.route("/api/unpaid_worklogs/<int:relationship_id>")
+@conditional_get(WorkLog)
+def api_unpaid_worklogs(relationship_id):
+    #logs = WorkLog.query.filter_by(relationship_id=relationship_id, is_paid=False).all()
+    logs = (
+        WorkLog.query
+        .filter(
+            and_(
+                WorkLog.relationship_id == relationship_id,
+                WorkLog.payroll_id.is_(None)
+            )
+        )
+        .all()
+    )
+    print(logs)
+    return jsonify([{
+        "id": log.id,
+        "start_date": log.start_date.strftime("%Y-%m-%d"),
+        "end_date": log.end_date.strftime("%Y-%m-%d"),
+        "due_payment": log.due_payment
+    } for log in logs])
+
+
+@bp.route("/api/unpaid_supply_logs/<int:relationship_id>")
+def api_unpaid_supply_logs(relationship_id):
+    logs = (
+        SupplyLog.query
+        .options(joinedload(SupplyLog.supply_type))
+        .filter(
+            SupplyLog.supplier_id == relationship_id,
+            SupplyLog.payment_id.is_(None)
+        )
+        .order_by(SupplyLog.date, SupplyLog.id)
+        .all()
+    )
+    return jsonify([{
+        "id": log.id,
+        "date": log.date.strftime("%Y-%m-%d"),
+        "supply_type": log.supply_type.name,
+        "units": log.units,
+        "unit_price": log.unit_price,
+        "amount": log.amount
+    } for log in logs])
+
+
+@bp.route("/api/supply_type_totals")
+def api_supply_type_totals():
+    start_date, end_date = date_arg("start_date"), date_arg("end_date")
+    return jsonify(supply_type_tree_rows(supply_type_totals(start_date, end_date)))
+
+
+# --- Full-text search ---
+SEARCH_LIMIT = 20
+SEARCH_CANDIDATES = 2000
+
+
+def search(kind, q, limit=SEARCH_LIMIT):
+    """Best `limit` matches for q in one index, ranked by bm25; [(row, rank)].
+
+    Only the newest SEARCH_CANDIDATES matches are ranked, so a word that
+    appears in most rows costs a bounded scan rather than scoring them all.
+    """
+    match = fts_match(q)
+    if match is None:
+        return []
+    table, _ = SEARCH_INDEXES[kind]
+    fts = f"{table}_fts"
+    ranked = db.session.execute(
+        text(
+            f"SELECT rowid, rank FROM ("
+            f"  SELECT rowid, bm25({fts}) AS rank FROM {fts} WHERE {fts} MATCH :match"
+            f"  ORDER BY rowid DESC LIMIT :candidates"
+            f") ORDER BY rank LIMIT :limit"
+        ),
+        {"match": match, "candidates": SEARCH_CANDIDATES, "limit": limit}
+    ).all()
+    if not ranked:
+        return []
+    model = SEARCH_RESULTS[kind][0]
+    rows = {row.id: row for row in model.query.options(*search_loaders(kind)).filter(model.id.in_([r.rowid for r in ranked]))}
+    return [(rows[r.rowid], r.rank) for r in ranked if r.rowid in rows]
+
+
+SEARCH_RESULTS = {
+    "entities": (Entity, entity_to_dict),
+    "transactions": (Transaction, transaction_to_dict),
+    "worklogs": (WorkLog, worklog_to_dict),
+    "supply_logs": (SupplyLog, supply_log_to_dict),
+}
+
+
+def search_loaders(kind):
+    """Eager-load options for the rows search(kind, ...) returns.
+
+    Built per call: loader options configure every mapper, which importing
+    this module shouldn't do.
+    """
+    if kind == "transactions":
+        return (
+            joinedload(Transaction.transaction_type),
+            joinedload(Transaction.relationship).joinedload(Relationship.entity),
+            joinedload(Transaction.relationship).joinedload(Relationship.relationship_type),
+        )
+    if kind == "worklogs":
+        return (
+            joinedload(WorkLog.work_type),
+            joinedload(WorkLog.relationship).joinedload(Relationship.entity),
+        )
+    if kind == "supply_logs":
+        return (
+            joinedload(SupplyLog.supplier).joinedload(Relationship.entity),
+            joinedload(SupplyLog.supply_type),
+        )
+    return ()
+
+
+@bp.route("/api/search")
+@bp.route("/api/v1/search")
+def api_search():
+    q = request.args.get("q", "")
+    kind = request.args.get("kind")
+    if kind and kind not in SEARCH_INDEXES:
+        abort(400, f"kind must be one of {', '.join(SEARCH_INDEXES)}")
+    limit = min(int_arg("limit") or SEARCH_LIMIT, MAX_PAGE_SIZE)
+    results = {}
+    for name in ([kind] if kind else SEARCH_INDEXES):
+        to_dict = SEARCH_RESULTS[name][1]
+        results[name] = [dict(to_dict(row), rank=rank) for row, rank in search(name, q, limit)]
+    return jsonify({"q": q, "results": results})
+
+
+# --- Typeahead lookups ---
+# Form pages no longer render every counterparty as an <option>; the
+# typeahead widget (templates/_typeahead.html) asks these endpoints for a
+# few name-prefix matches as the user types. Prefix LIKE on entity.name is
+# served by ix_entity_name_nocase.
+LOOKUP_LIMIT = 20
+
+
+def name_prefix_filter(q):
+    """Case-insensitive `Entity.name` prefix match that SQLite can answer from the NOCASE index."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return Entity.name.like(escaped + "%", escape="\\")
+
+
+def lookup_relationship_type():
+    """Relationship type from ?type=<name> or ?type_id=<id>, or None for all types."""
+    type_name = request.args.get("type")
+    type_id = int_arg("type_id")
+    if not type_name and not type_id:
+        return None
+    rel_type = reference_data.by_name(RelationshipType, type_name) if type_name \
+        else reference_data.get(RelationshipType, type_id)
+    if rel_type is None:
+        abort(400, "Unknown relationship type")
+    return rel_type
+
+
+@bp.route("/api/relationships/lookup")
+@bp.route("/api/v1/relationships/lookup")
+def api_relationship_lookup():
+    q = request.args.get("q", "").strip()
+    rel_type = lookup_relationship_type()
+    limit = min(int_arg("limit") or LOOKUP_LIMIT, MAX_PAGE_SIZE)
+    query = (
+        db.session.query(Relationship.id, Relationship.entity_id, Entity.name, Relationship.relationship_type_id)
+        .join(Entity, Relationship.entity_id == Entity.id)
+        .filter(name_prefix_filter(q))
+    )
+    if rel_type:
+        query = query.filter(Relationship.relationship_type_id == rel_type.id)
+    rows = query.order_by(Entity.name.collate("NOCASE"), Relationship.id).limit(limit).all()
+    return jsonify({"items": [
+        {
+            "id": row.id,
+            "entity_id": row.entity_id,
+            "entity": row.name,
+            "relationship_type_id": row.relationship_type_id,
+            "label": relationship_label(row.name, row.relationship_type_id, with_type=rel_type is None),
+        }
+        for row in rows
+    ]})
+
+
+@bp.route("/api/entities/lookup")
+@bp.route("/api/v1/entities/lookup")
+def api_entity_lookup():
+    q = request.args.get("q", "").strip()
+    limit = min(int_arg("limit") or LOOKUP_LIMIT, MAX_PAGE_SIZE)
+    rows = (
+        db.session.query(Entity.id, Entity.name)
+        .filter(name_prefix_filter(q))
+        .order_by(Entity.name.collate("NOCASE"), Entity.id)
+        .limit(limit)
+        .all()
+    )
+    return jsonify({"items": [{"id": row.id, "label": row.name} for row in rows]})
+
+
+# --- Supply payments ---
+@bp.route("/api/v1/supply_payments", methods=["POST"])
+def api_v1_supply_payment():
+    """Pay one supplier's selected logs: {"supplier_id": 3, "supply_log_ids": [10, 11]}."""
+    payload = request.get_json(silent=True) or {}
+    supplier_id = payload.get("supplier_id")
+    log_ids = payload.get("supply_log_ids")
+    if not isinstance(supplier_id, int) or not isinstance(log_ids, list) or not log_ids \
+            or not all(isinstance(i, int) for i in log_ids):
+        abort(400, "Expected supplier_id and a non-empty list of supply_log_ids")
+    log_ids = sorted(set(log_ids))
+    if payable_supply_log_count(supplier_id, log_ids) != len(log_ids):
+        abort(409, "Some supply logs are already paid or belong to another supplier")
+    try:
+        results = run_supply_payments(supplier_ids=[supplier_id], log_ids=log_ids)
+    except SupplyPaymentError as exc:
+        abort(409, str(exc))
+    if not results:
+        abort(409, "The supply logs were paid by another run")  # between the check and the payment
+    return jsonify(results[0]), 201
+
+
+# --- JSON batch API (v1) ---
+# POST /api/v1/<kind> takes a JSON array of records (or {"items": [...]})
+# and creates them all in one transaction. Records refer to other rows by
+# id, as the GET /api/... responses do. Every record is validated first:
+# if any fails, nothing is written and the response is 422 with an error
+# per failing index; otherwise it is 201 with the new id per index.
+API_BATCH_MAX = 500
+
+
+class ApiItemError(ValueError):
+    pass
+
+
+def _api_value(item, field, kind, required=True):
+    value = item.get(field)
+    if value is None or value == "":
+        if required:
+            raise ApiItemError(f"{field} is required")
+        return None
+    if kind == "date":
+        try:
+            return datetime.strptime(str(value), "%Y-%m-%d").date()
+        except ValueError:
+            raise ApiItemError(f"{field} must be a YYYY-MM-DD date")
+    if kind in ("number", "id"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ApiItemError(f"{field} must be a number")
+        if kind == "id" and value != int(value):
+            raise ApiItemError(f"{field} must be an integer id")
+        return int(value) if kind == "id" else float(value)
+    if not isinstance(value, str):
+        raise ApiItemError(f"{field} must be a string")
+    return value.strip()
+
+
+def _api_ids(batch, field):
+    return {item[field] for item in batch if isinstance(item.get(field), int) and not isinstance(item[field], bool)}
+
+
+def relationship_ids_of_type(ids, type_name=None):
+    """The subset of `ids` that are relationships (of `type_name`, if given), in one query."""
+    if not ids:
+        return set()
+    query = db.session.query(Relationship.id).filter(Relationship.id.in_(ids))
+    if type_name is not None:
+        rel_type = reference_data.by_name(RelationshipType, type_name)
+        if rel_type is None:
+            return set()
+        query = query.filter(Relationship.relationship_type_id == rel_type.id)
+    return {rel_id for rel_id, in query}
+
+
+def entity_api_converter(batch):
+    emails = {item["email"].strip() for item in batch if isinstance(item.get("email"), str)}
+    taken = {email for email, in db.session.query(Entity.email).filter(Entity.email.in_(emails))} if emails else set()
+
+    def convert(item):
+        email = _api_value(item, "email", "str")
+        if email in taken:
+            raise ApiItemError(f"email {email!r} is already in use")
+        values = {
+            "name": _api_value(item, "name", "str"),
+            "email": email,
+            "phone": _api_value(item, "phone", "str"),
+            "address": _api_value(item, "address", "str", required=False),
+        }
+        taken.add(email)  # later duplicates in the same batch
+        return values
+    return convert
+
+
+def relationship_api_converter(batch):
+    entity_ids = _api_ids(batch, "entity_id")
+    existing = {entity_id for entity_id, in db.session.query(Entity.id).filter(Entity.id.in_(entity_ids))} \
+        if entity_ids else set()
+
+    def convert(item):
+        entity_id = _api_value(item, "entity_id", "id")
+        if entity_id not in existing:
+            raise ApiItemError(f"unknown entity_id {entity_id}")
+        type_id = _api_value(item, "relationship_type_id", "id")
+        if reference_data.get(RelationshipType, type_id) is None:
+            raise ApiItemError(f"unknown relationship_type_id {type_id}")
+        return {"entity_id": entity_id, "relationship_type_id": type_id}
+    return convert
+
+
+def worklog_api_converter(batch):
+    employees = relationship_ids_of_type(_api_ids(batch, "relationship_id"), "Employee")
+    rates = work_type_rates(_api_ids(batch, "work_type_id"))
+
+    def convert(item):
+        start_date = _api_value(item, "start_date", "date")
+        end_date = _api_value(item, "end_date", "date")
+        if end_date < start_date:
+            raise ApiItemError("end_date is before start_date")
+        relationship_id = _api_value(item, "relationship_id", "id")
+        if relationship_id not in employees:
+            raise ApiItemError(f"relationship_id {relationship_id} is not an employee")
+        work_type_id = _api_value(item, "work_type_id", "id")
+        if work_type_id not in rates:
+            raise ApiItemError(f"unknown work_type_id {work_type_id}")
+        work_units = _api_value(item, "work_units", "number")
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "work_type_id": work_type_id,
+            "relationship_id": relationship_id,
+            "work_units": work_units,
+            "due_payment": rates[work_type_id] * work_units,
+            "description": _api_value(item, "description", "str", required=False) or "",
+        }
+    return convert
+
+
+def supply_log_api_converter(batch):
+    suppliers = relationship_ids_of_type(_api_ids(batch, "supplier_id"), "Supplier")
+
+    def convert(item):
+        supplier_id = _api_value(item, "supplier_id", "id")
+        if supplier_id not in suppliers:
+            raise ApiItemError(f"supplier_id {supplier_id} is not a supplier")
+        supply_type = reference_data.get(SupplyType, _api_value(item, "supply_type_id", "id"))
+        if supply_type is None:
+            raise ApiItemError(f"unknown supply_type_id {item['supply_type_id']}")
+        unit_price = _api_value(item, "unit_price", "number")
+        units = _api_value(item, "units", "number")
+        return {
+            "date": _api_value(item, "date", "date"),
+            "supplier_id": supplier_id,
+            "supply_type_id": supply_type.id,
+            "unit_price": unit_price,
+            "units": units,
+            "amount": unit_price * units,
+            "description": _api_value(item, "description", "str", required=False),
+        }
+    return convert
+
+
+def transaction_api_converter(batch):
+    relationships = relationship_ids_of_type(_api_ids(batch, "relationship_id"))
+
+    def convert(item):
+        txn_type = reference_data.get(TransactionType, _api_value(item, "transaction_type_id", "id"))
+        if txn_type is None:
+            raise ApiItemError(f"unknown transaction_type_id {item['transaction_type_id']}")
+        if txn_type.name == "Payroll":
+            raise ApiItemError("Payroll transactions are created by paying work logs")
+        relationship_id = _api_value(item, "relationship_id", "id")
+        if relationship_id not in relationships:
+            raise ApiItemError(f"unknown relationship_id {relationship_id}")
+        return {
+            "date": _api_value(item, "date", "date"),
+            "transaction_type_id": txn_type.id,
+            "relationship_id": relationship_id,
+            "amount": _api_value(item, "amount", "number"),
+            "description": _api_value(item, "description", "str", required=False) or "",
+        }
+    return convert
+
+
+API_CREATORS = {
+    "entities": (Entity, entity_api_converter),
+    "relationships": (Relationship, relationship_api_converter),
+    "worklogs": (WorkLog, worklog_api_converter),
+    "supply_logs": (SupplyLog, supply_log_api_converter),
+    "transactions": (Transaction, transaction_api_converter),
+}
+
+
+@bp.route("/api/v1/<kind>", methods=["POST"])
+def api_v1_create(kind):
+    if kind not in API_CREATORS:
+        abort(404)
+    model, make_converter = API_CREATORS[kind]
+    payload = request.get_json(silent=True)
+    items = payload.get("items") if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        abort(400, "Expected a non-empty JSON array of records")
+    if len(items) > API_BATCH_MAX:
+        abort(400, f"At most {API_BATCH_MAX} records per request")
+
+    convert = make_converter([item for item in items if isinstance(item, dict)])
+    values, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ApiItemError("record must be a JSON object")
+            values.append(convert(item))
+        except ApiItemError as exc:
+            errors.append({"index": index, "status": "error", "error": str(exc)})
+    if errors:
+        return jsonify({"created": 0, "results": errors}), 422
+
+    # Ordered RETURNING runs one INSERT per row on SQLite, but inside a
+    # single transaction that is still far cheaper than a request per record.
+    table = model.__table__
+    ids = db.session.execute(
+        table.insert().returning(table.c.id, sort_by_parameter_order=True), values
+    ).scalars().all()
+    record_core_insert(model, values)
+    db.session.commit()
+    return jsonify({
+        "created": len(ids),
+        "results": [{"index": index, "status": "created", "id": id} for index, id in enumerate(ids)],
+    }), 201
@@ -0,0 +1,178 @@
+"""The flask CLI commands: seeding, rollup and index rebuilds, payment runs and CSV import."""
+import csv
+from datetime import date
+
+import click
+from flask import Blueprint
+from sqlalchemy import func
+
+from app.core.csv_import import IMPORT_BATCH_SIZE, IMPORTERS, import_csv
+from app.core.database import db
+from app.core.payments import PayrollRunError, SupplyPaymentError, run_payroll, run_supply_payments
+from app.core.rollups import rebuild_ledger_daily, rebuild_relationship_balances, rebuild_supply_type_closure
+from app.core.search import SEARCH_INDEXES, rebuild_search_indexes
+from app.core.seed import seed_defaults
+from app.models import (
+    LedgerDaily, Payroll, Relationship, RelationshipBalance, SupplyLog, SupplyPayment, SupplyTypeClosure,
+    Transaction, TransactionType, WorkLog,
+)
+
+# Commands go straight under `flask` (flask seed, flask import, ...)
+bp = Blueprint("commands", __name__, cli_group=None)
+
+
+@bp.cli.command("rebuild-ledger")
+def rebuild_ledger_command():
+    """Rebuild the daily ledger rollup from scratch."""
+    rebuild_ledger_daily()
+    click.echo(f"Rebuilt ledger_daily: {LedgerDaily.query.count()} rows.")
+
+
+@bp.cli.command("reconcile-balances")
+def reconcile_balances_command():
+    """Rebuild relationship_balance from the logs and report rows that had drifted."""
+    wrong = rebuild_relationship_balances()
+    click.echo(f"Rebuilt relationship_balance: {RelationshipBalance.query.count()} rows, {wrong} corrected.")
+
+
+@bp.cli.command("rebuild-supply-tree")
+def rebuild_supply_tree_command():
+    """Rebuild the supply type closure table from parent_id."""
+    rebuild_supply_type_closure()
+    click.echo(f"Rebuilt supply_type_closure: {SupplyTypeClosure.query.count()} rows.")
+
+
+@bp.cli.command("rebuild-search")
+def rebuild_search_command():
+    """Rebuild the full-text search indexes from their tables."""
+    rebuild_search_indexes()
+    click.echo("Rebuilt search indexes: " + ", ".join(f"{t}_fts" for t, _ in SEARCH_INDEXES.values()))
+
+
+@bp.cli.command("payroll-run")
+@click.option("--start", "start_date", required=True, type=click.DateTime(["%Y-%m-%d"]))
+@click.option("--end", "end_date", required=True, type=click.DateTime(["%Y-%m-%d"]))
+@click.option("--employee", "relationship_ids", multiple=True, type=int,
+              help="Employee relationship id to pay; repeat for several. Default: everyone.")
+def payroll_run_command(start_date, end_date, relationship_ids):
+    """Pay all unpaid work logs that start between --start and --end."""
+    try:
+        results = run_payroll(start_date.date(), end_date.date(), list(relationship_ids))
+    except PayrollRunError as exc:
+        raise click.ClickException(str(exc))
+    for r in results:
+        click.echo(f"{r['employee']}: {r['worklogs']} work logs, {r['amount']:.2f} (transaction #{r['transaction_id']})")
+    click.echo(f"Paid {len(results)} employees, {sum(r['amount'] for r in results):.2f} in total.")
+
+
+@bp.cli.command("supply-payment-run")
+@click.option("--start", "start_date", required=True, type=click.DateTime(["%Y-%m-%d"]))
+@click.option("--end", "end_date", required=True, type=click.DateTime(["%Y-%m-%d"]))
+@click.option("--supplier", "supplier_ids", multiple=True, type=int,
+              help="Supplier relationship id to pay; repeat for several. Default: every supplier.")
+def supply_payment_run_command(start_date, end_date, supplier_ids):
+    """Pay all unpaid supply logs dated between --start and --end."""
+    try:
+        results = run_supply_payments(start_date.date(), end_date.date(), list(supplier_ids))
+    except SupplyPaymentError as exc:
+        raise click.ClickException(str(exc))
+    for r in results:
+        click.echo(f"{r['supplier']}: {r['supply_logs']} supply logs, {r['amount']:.2f} (transaction #{r['transaction_id']})")
+    click.echo(f"Paid {len(results)} suppliers, {sum(r['amount'] for r in results):.2f} in total.")
+
+
+@bp.cli.command("seed")
+def seed_command():
+    """Create the default relationship, work and transaction types if missing."""
+    seed_defaults()
+    click.echo("Default types are in place.")
+
+
+# --- Index checks ---
+def explain_query_plan(query):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for an ORM query."""
+    compiled = query.statement.compile(db.engine)
+    params = tuple(
+        value.isoformat() if isinstance(value, date) else value
+        for value in (compiled.params[name] for name in compiled.positiontup)
+    )
+    rows = db.session.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + str(compiled), params
+    ).all()
+    return [row[-1] for row in rows]
+
+
+def hot_queries():
+    today = date.today()
+    return {
+        "dashboard transaction summary": (
+            db.session.query(TransactionType.name, func.sum(LedgerDaily.total_amount))
+            .join(TransactionType, LedgerDaily.transaction_type_id == TransactionType.id)
+            .filter(LedgerDaily.day >= today, LedgerDaily.day <= today)
+            .group_by(TransactionType.name)
+        ),
+        "unpaid worklogs for employee": WorkLog.query.filter(
+            WorkLog.relationship_id == 1, WorkLog.payroll_id.is_(None)
+        ),
+        "worklogs in payroll": WorkLog.query.filter(WorkLog.payroll_id == 1),
+        "relationships of entity": Relationship.query.filter(Relationship.entity_id == 1),
+        "relationships of type": Relationship.query.filter(Relationship.relationship_type_id == 1),
+        "transactions of relationship": (
+            Transaction.query.filter(Transaction.relationship_id == 1)
+            .order_by(Transaction.date.desc())
+        ),
+        "transactions in date range": (
+            Transaction.query.filter(Transaction.date >= today, Transaction.date <= today)
+        ),
+        "supply logs of supplier in date range": SupplyLog.query.filter(
+            SupplyLog.supplier_id == 1, SupplyLog.date >= today, SupplyLog.date <= today
+        ),
+        "unpaid supply logs for supplier": SupplyLog.query.filter(
+            SupplyLog.supplier_id == 1, SupplyLog.payment_id.is_(None)
+        ),
+        "supply logs in payment": SupplyLog.query.filter(SupplyLog.payment_id == 1),
+        "payroll of transaction": Payroll.query.filter(Payroll.transaction_id == 1),
+        "supply payment of transaction": SupplyPayment.query.filter(SupplyPayment.transaction_id == 1),
+    }
+
+
+@bp.cli.command("check-indexes")
+def check_indexes():
+    """Show the query plan of each hot lookup and fail if any scans a whole table."""
+    full_scans = []
+    for name, query in hot_queries().items():
+        plan = explain_query_plan(query)
+        click.echo(f"{name}:")
+        for line in plan:
+            click.echo(f"    {line}")
+            if line.startswith("SCAN") and "INDEX" not in line:
+                full_scans.append(name)
+    if full_scans:
+        raise click.ClickException("Full table scan in: " + ", ".join(full_scans))
+    click.echo("All hot queries use an index.")
+
+
+@bp.cli.command("import")
+@click.argument("kind", type=click.Choice(sorted(IMPORTERS)))
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--rejects", "rejects_path", type=click.Path(dir_okay=False),
+              help="Where to write rejected rows (default: <csv_path>.rejects.csv).")
+@click.option("--batch-size", default=IMPORT_BATCH_SIZE, show_default=True)
+def import_command(kind, csv_path, rejects_path, batch_size):
+    """Bulk-load worklogs, supply_logs or transactions from a CSV file.
+
+    \b
+    Columns (description is optional for all):
+      worklogs:     start_date, end_date, employee, work_type, work_units
+      supply_logs:  date, supplier, supply_type, unit_price, units
+      transactions: date, transaction_type, entity, relationship_type, amount
+    Dates are YYYY-MM-DD; employee, supplier and entity are entity names.
+    """
+    rejects_path = rejects_path or csv_path + ".rejects.csv"
+    with open(csv_path, newline="") as csv_file, open(rejects_path, "w", newline="") as rejects_file:
+        fieldnames = next(csv.reader(csv_file), [])
+        csv_file.seek(0)
+        reject_writer = csv.DictWriter(rejects_file, fieldnames=fieldnames + ["error"], extrasaction="ignore")
+        reject_writer.writeheader()
+        imported, rejected = import_csv(kind, csv_file, reject_writer, batch_size)
+    click.echo(f"Imported {imported} {kind}; {rejected} rejected" + (f" (see {rejects_path})" if rejected else "."))
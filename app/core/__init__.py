@@ -0,0 +1 @@
+"""Database setup, rollups, caches and domain logic shared by the blueprints; no routes live here."""
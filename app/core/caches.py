@@ -0,0 +1,257 @@
+"""Per-app, in-process caches of the type tables and the dashboard summaries.
+
+create_app puts one ReferenceCache and one SummaryCache in app.extensions,
+so two apps (say, on different databases) never serve each other's rows;
+`reference_data` and `dashboard_cache` stand for those of the current app.
+The session hooks below drop cached entries once a commit changes their
+tables.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.local import LocalProxy
+
+from app.core.database import as_date, committed_value, db
+from app.core.versions import table_versions
+from app.models import Relationship, RelationshipType, SupplyType, Transaction, TransactionType, WorkType
+
+# --- Reference data cache ---
+class ReferenceCache:
+    """In-process copy of the small type tables, looked up by id or by name.
+
+    Each table is loaded with one query the first time it is needed and kept
+    as immutable records (namedtuples of the column values), so they are safe
+    to share between requests and threads. Commits that touch a cached table
+    drop its copy in this process; a copy whose table_version has moved on
+    (a write in another worker process) or that is older than
+    REFERENCE_CACHE_TTL is reloaded, as is one that misses an id or name.
+    Rates are priced from the table itself: see work_type_rates().
+    """
+
+    def __init__(self, models, ttl):
+        self.models = models
+        self.ttl = ttl
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._records = {
+            model: namedtuple(model.__name__ + "Record", [c.key for c in model.__table__.columns])
+            for model in models
+        }
+
+    def _table(self, model, reload=False):
+        now = time.monotonic()
+        table = self._tables.get(model)
+        version = table_versions([model.__tablename__])[0]
+        if reload or table is None or table["expires"] <= now or table["version"] != version:
+            record = self._records[model]
+            rows = db.session.execute(db.select(model.__table__).order_by(model.id)).all()
+            records = [record(*row) for row in rows]
+            table = {
+                "expires": now + self.ttl,
+                "version": version,
+                "all": records,
+                "by_id": {r.id: r for r in records},
+                "by_name": {r.name: r for r in records},
+            }
+            with self._lock:
+                self._tables[model] = table
+            if has_app_context():
+                g.setdefault("reference_loaded", set()).add(model)
+        return table
+
+    def all(self, model):
+        return self._table(model)["all"]
+
+    def _lookup(self, model, index, key):
+        table = self._table(model)
+        if key not in table[index]:
+            # Possibly a row added since this copy was loaded (by a writer
+            # that bypassed table_version); reload once per request before
+            # treating it as missing
+            loaded = g.setdefault("reference_loaded", set()) if has_app_context() else set()
+            if model not in loaded:
+                table = self._table(model, reload=True)
+        return table[index].get(key)
+
+    def get(self, model, id):
+        try:
+            return self._lookup(model, "by_id", int(id))
+        except (TypeError, ValueError):
+            return None
+
+    def by_name(self, model, name):
+        return self._lookup(model, "by_name", name)
+
+    def invalidate(self, models=None):
+        with self._lock:
+            for model in (models or list(self._tables)):
+                self._tables.pop(model, None)
+
+
+REFERENCE_MODELS = (RelationshipType, TransactionType, WorkType, SupplyType)
+reference_data = LocalProxy(lambda: current_app.extensions["reference_data"])
+
+
+def work_type_rates(ids):
+    """Map work type id -> current rate for the given ids, in one query.
+
+    Read from the table rather than reference_data so a due_payment is never
+    priced from a copy that predates a rate change.
+    """
+    if not ids:
+        return {}
+    return dict(db.session.query(WorkType.id, WorkType.rate).filter(WorkType.id.in_(ids)).all())
+
+
+@event.listens_for(Session, "after_flush")
+def track_reference_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if type(obj) in REFERENCE_MODELS:
+            session.info.setdefault("reference_changes", set()).add(type(obj))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def track_bulk_reference_changes(orm_execute_state):
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert) \
+            and mapper is not None and mapper.class_ in REFERENCE_MODELS:
+        orm_execute_state.session.info.setdefault("reference_changes", set()).add(mapper.class_)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_reference_data(session):
+    changed = session.info.pop("reference_changes", None)
+    if changed and has_app_context():
+        reference_data.invalidate(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_reference_changes(session):
+    session.info.pop("reference_changes", None)
+
+
+# --- Dashboard summaries & cache ---
+class SummaryCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters.
+
+    Keys are tuples whose first item names the summary, e.g.
+    ("transactions", start_date, end_date). Values must be plain data,
+    never ORM instances, since they outlive the session that loaded them.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # Don't store a value computed before an invalidation ran
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, predicate=lambda key: True):
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+dashboard_cache = LocalProxy(lambda: current_app.extensions["dashboard_cache"])
+
+
+def dashboard_changes(session):
+    return session.info.setdefault("dashboard_changes", {
+        "relationships": False,
+        "all_transactions": False,
+        "transaction_days": set(),
+    })
+
+
+@event.listens_for(Session, "after_flush")
+def track_dashboard_changes(session, flush_context):
+    changes = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Relationship, RelationshipType)):
+            changes = changes or dashboard_changes(session)
+            changes["relationships"] = True
+        elif isinstance(obj, TransactionType):
+            changes = changes or dashboard_changes(session)
+            changes["all_transactions"] = True
+        elif isinstance(obj, Transaction):
+            changes = changes or dashboard_changes(session)
+            changes["transaction_days"].add(as_date(obj.date))
+            if obj not in session.new:
+                changes["transaction_days"].add(as_date(committed_value(obj, "date")))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def track_bulk_dashboard_changes(orm_execute_state):
+    # query.update()/delete() never reach after_flush
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    if issubclass(mapper.class_, (Relationship, RelationshipType)):
+        dashboard_changes(orm_execute_state.session)["relationships"] = True
+    elif issubclass(mapper.class_, (Transaction, TransactionType)):
+        dashboard_changes(orm_execute_state.session)["all_transactions"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_dashboard_cache(session):
+    changes = session.info.pop("dashboard_changes", None)
+    if not changes or not has_app_context():
+        return
+    if changes["relationships"]:
+        dashboard_cache.invalidate(lambda key: key[0] == "relationships")
+    days = changes["transaction_days"] - {None}
+    if changes["all_transactions"]:
+        dashboard_cache.invalidate(lambda key: key[0] == "transactions")
+    elif days:
+        dashboard_cache.invalidate(
+            lambda key: key[0] == "transactions" and any(key[1] <= d <= key[2] for d in days)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_dashboard_changes(session):
+    session.info.pop("dashboard_changes", None)
@@ -0,0 +1,157 @@
+"""Cascading deletes.
+
+Force-deleting an entity or relationship type takes everything that
+depends on it along: relationships, their transactions, work logs and
+supply logs, and the payrolls and supply payments of those transactions.
+The plan is read from the foreign keys in db.metadata, so new models are
+picked up without changes here: a NOT NULL foreign key deletes the child
+row, a nullable one is set to NULL (a work log whose payroll is deleted
+becomes unpaid again). Rows go children first in chunks of
+CASCADE_DELETE_CHUNK, each chunk in its own short transaction, so other
+writers never wait longer than one chunk. A failure part way leaves the
+finished chunks deleted and every row still consistent; running the
+delete again carries on from there.
+"""
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+from sqlalchemy import and_, column, func, or_
+
+from app.core.database import db
+from app.core.rollups import record_core_delete, record_core_insert
+
+
+CascadeStep = namedtuple("CascadeStep", ["table", "action", "column", "condition"])
+
+# Kept in step by record_core_delete as the rows feeding them go, so they are
+# cleared after those rows and not reported to the user.
+ROLLUP_TABLES = ("ledger_daily", "relationship_balance", "supply_type_closure")
+
+
+def _model_for_table(table):
+    for mapper in db.Model.registry.mappers:
+        if mapper.local_table is table:
+            return mapper.class_
+    return None
+
+
+def _chunk_key(table):
+    """Column identifying one row of `table`; SQLite's rowid for composite keys."""
+    key = list(table.primary_key.columns)
+    return key[0] if len(key) == 1 else column("rowid")
+
+
+def cascade_plan(model, ids):
+    """Steps removing every row that depends on `model` rows `ids`, children first.
+
+    "delete" steps remove the rows of `table` matching `condition`;
+    "unlink" steps set the nullable foreign key `column` to NULL on them.
+    The `model` rows themselves are left to the caller.
+    """
+    root = model.__table__
+    conditions = {root: root.c.id.in_(ids)}
+    unlinks = {}
+    for table in db.metadata.sorted_tables:  # parents before children
+        if table is root:
+            continue
+        deletes, nulls = [], []
+        for fk in table.foreign_keys:
+            parent = fk.column.table
+            if parent is table or parent not in conditions:
+                continue
+            doomed = fk.parent.in_(db.select(fk.column).where(conditions[parent]))
+            if fk.parent.nullable:
+                nulls.append((fk.parent, doomed))
+            else:
+                deletes.append(doomed)
+        if deletes:
+            conditions[table] = or_(*deletes)
+        if nulls:
+            unlinks[table] = [
+                (col, and_(doomed, ~conditions[table]) if table in conditions else doomed)
+                for col, doomed in nulls
+            ]
+
+    order = [
+        t for t in reversed(db.metadata.sorted_tables)
+        if t is not root and (t in conditions or t in unlinks)
+    ]
+    rollups = [t for t in order if t.name in ROLLUP_TABLES]
+    order = [t for t in order if t.name not in ROLLUP_TABLES]
+    for rollup in rollups:
+        parents = {fk.column.table for fk in rollup.foreign_keys}
+        order.insert(next((i for i, t in enumerate(order) if t in parents), len(order)), rollup)
+
+    steps = []
+    for table in order:
+        if table in conditions:
+            steps.append(CascadeStep(table, "delete", None, conditions[table]))
+        for col, condition in unlinks.get(table, ()):
+            steps.append(CascadeStep(table, "unlink", col, condition))
+    return steps
+
+
+def _cascade_label(step):
+    return step.table.name if step.action == "delete" else f"{step.table.name} unlinked"
+
+
+def cascade_counts(steps):
+    """{table name: rows the steps will delete (or unlink)}, skipping empty tables and rollups."""
+    counts = OrderedDict()
+    for step in steps:
+        if step.table.name in ROLLUP_TABLES:
+            continue
+        count = db.session.execute(
+            db.select(func.count()).select_from(step.table).where(step.condition)
+        ).scalar()
+        if count:
+            counts[_cascade_label(step)] = count
+    return counts
+
+
+def cascade_delete(model, ids, progress=None):
+    """Delete `model` rows `ids` and everything depending on them, a chunk per transaction.
+
+    `progress(done, total)` is called inside each chunk's transaction, just
+    before it commits. Returns {table name: rows deleted (or unlinked)}.
+    """
+    chunk_size = current_app.config["CASCADE_DELETE_CHUNK"]
+    steps = cascade_plan(model, ids)
+    total = sum(cascade_counts(steps).values()) + len(ids)
+    done = 0
+    deleted = OrderedDict()
+    for step in steps:
+        table, step_model = step.table, _model_for_table(step.table)
+        key = _chunk_key(table)
+        columns = list(table.columns) if key.table is table else list(table.columns) + [key]
+        while True:
+            rows = [r._mapping for r in db.session.execute(
+                db.select(*columns).where(step.condition).limit(chunk_size)
+            )]
+            if not rows:
+                break
+            keys = [r[key.name] for r in rows]
+            record_core_delete(step_model, rows)
+            if step.action == "delete":
+                db.session.execute(table.delete().where(key.in_(keys)))
+            else:
+                db.session.execute(table.update().where(key.in_(keys)).values({step.column.name: None}))
+                record_core_insert(step_model, [dict(r, **{step.column.name: None}) for r in rows])
+            if table.name not in ROLLUP_TABLES:
+                label = _cascade_label(step)
+                deleted[label] = deleted.get(label, 0) + len(rows)
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+            db.session.commit()
+            time.sleep(current_app.config["CASCADE_DELETE_PAUSE"])
+
+    # The rows themselves go through the session so its flush hooks see them
+    for obj in model.query.filter(model.id.in_(ids)):
+        db.session.delete(obj)
+        deleted[model.__tablename__] = deleted.get(model.__tablename__, 0) + 1
+    if progress:
+        progress(total, total)
+    db.session.commit()
+    return deleted
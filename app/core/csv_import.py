@@ -0,0 +1,193 @@
+"""Bulk CSV import of work logs, supply logs and transactions (flask import)."""
+import csv
+from datetime import datetime
+from itertools import islice
+
+import click
+
+from app.core.database import db
+from app.core.rollups import record_core_insert
+from app.models import (
+    Entity, Relationship, RelationshipType, SupplyLog, SupplyType, Transaction, TransactionType, WorkLog, WorkType,
+)
+
+
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_COLUMNS = {
+    "worklogs": ["start_date", "end_date", "employee", "work_type", "work_units"],
+    "supply_logs": ["date", "supplier", "supply_type", "unit_price", "units"],
+    "transactions": ["date", "transaction_type", "entity", "relationship_type", "amount"],
+}
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def _import_date(row, column):
+    try:
+        return datetime.strptime(row[column].strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise ImportRowError(f"{column} must be a YYYY-MM-DD date")
+
+
+def _import_float(row, column):
+    try:
+        return float(row[column])
+    except ValueError:
+        raise ImportRowError(f"{column} must be a number")
+
+
+def _lookup(mapping, key, label):
+    ids = mapping.get(key)
+    if not ids:
+        raise ImportRowError(f"unknown {label} {key!r}")
+    if len(ids) > 1:
+        raise ImportRowError(f"ambiguous {label} {key!r}")
+    return ids[0]
+
+
+def relationship_ids_by_name(pairs):
+    """Map (entity name, relationship type name) pairs to their relationship ids.
+
+    One query for the whole batch; each value is a list so callers can tell
+    unknown names from ambiguous ones.
+    """
+    if not pairs:
+        return {}
+    rows = (
+        db.session.query(Relationship.id, Entity.name, RelationshipType.name)
+        .join(Entity, Relationship.entity_id == Entity.id)
+        .join(RelationshipType, Relationship.relationship_type_id == RelationshipType.id)
+        .filter(
+            Entity.name.in_({entity for entity, _ in pairs}),
+            RelationshipType.name.in_({rel_type for _, rel_type in pairs})
+        )
+        .all()
+    )
+    mapping = {}
+    for rel_id, entity_name, type_name in rows:
+        mapping.setdefault((entity_name, type_name), []).append(rel_id)
+    return mapping
+
+
+def ids_by_name(model, names, *columns):
+    """Map name -> [id, *columns] for the given names, in one query."""
+    rows = db.session.query(model.name, model.id, *columns).filter(model.name.in_(names)).all()
+    return {row[0]: [tuple(row[1:]) if columns else row[1]] for row in rows}
+
+
+def worklog_converter(batch):
+    employees = relationship_ids_by_name({(row["employee"], "Employee") for row in batch})
+    work_types = ids_by_name(WorkType, {row["work_type"] for row in batch}, WorkType.rate)
+
+    def convert(row):
+        start_date = _import_date(row, "start_date")
+        end_date = _import_date(row, "end_date")
+        if end_date < start_date:
+            raise ImportRowError("end_date is before start_date")
+        work_type_id, rate = _lookup(work_types, row["work_type"], "work type")
+        work_units = _import_float(row, "work_units")
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "work_type_id": work_type_id,
+            "relationship_id": _lookup(employees, (row["employee"], "Employee"), "employee"),
+            "work_units": work_units,
+            "due_payment": rate * work_units,
+            "description": row.get("description") or "",
+        }
+    return convert
+
+
+def supply_log_converter(batch):
+    suppliers = relationship_ids_by_name({(row["supplier"], "Supplier") for row in batch})
+    supply_types = ids_by_name(SupplyType, {row["supply_type"] for row in batch})
+
+    def convert(row):
+        unit_price = _import_float(row, "unit_price")
+        units = _import_float(row, "units")
+        return {
+            "date": _import_date(row, "date"),
+            "supplier_id": _lookup(suppliers, (row["supplier"], "Supplier"), "supplier"),
+            "supply_type_id": _lookup(supply_types, row["supply_type"], "supply type"),
+            "unit_price": unit_price,
+            "units": units,
+            "amount": unit_price * units,
+            "description": row.get("description") or None,
+        }
+    return convert
+
+
+def transaction_converter(batch):
+    relationships = relationship_ids_by_name({(row["entity"], row["relationship_type"]) for row in batch})
+    txn_types = ids_by_name(TransactionType, {row["transaction_type"] for row in batch})
+
+    def convert(row):
+        if row["transaction_type"] == "Payroll":
+            raise ImportRowError("Payroll transactions are created by paying work logs")
+        return {
+            "date": _import_date(row, "date"),
+            "transaction_type_id": _lookup(txn_types, row["transaction_type"], "transaction type"),
+            "relationship_id": _lookup(
+                relationships, (row["entity"], row["relationship_type"]), "relationship"
+            ),
+            "amount": _import_float(row, "amount"),
+            "description": row.get("description") or "",
+        }
+    return convert
+
+
+IMPORTERS = {
+    "worklogs": (WorkLog, worklog_converter),
+    "supply_logs": (SupplyLog, supply_log_converter),
+    "transactions": (Transaction, transaction_converter),
+}
+
+
+def import_csv(kind, csv_file, reject_writer, batch_size=IMPORT_BATCH_SIZE):
+    """Stream `csv_file` into the `kind` table in batches; returns (imported, rejected).
+
+    Names are resolved with one query per lookup table per batch, and each
+    batch is written with a single executemany INSERT and its own commit.
+    Rows that fail validation are written to `reject_writer` with an
+    "error" column instead.
+    """
+    model, make_converter = IMPORTERS[kind]
+    required = IMPORT_COLUMNS[kind]
+    reader = csv.DictReader(csv_file)
+    missing = set(required) - set(reader.fieldnames or [])
+    if missing:
+        raise click.ClickException(f"Missing columns: {', '.join(sorted(missing))}")
+
+    imported = rejected = 0
+    while True:
+        batch = list(islice(reader, batch_size))
+        if not batch:
+            break
+
+        complete = []
+        for row in batch:
+            blank = [column for column in required if not (row.get(column) or "").strip()]
+            if blank:
+                reject_writer.writerow({**row, "error": "missing " + ", ".join(blank)})
+                rejected += 1
+            else:
+                complete.append(row)
+
+        convert = make_converter(complete) if complete else None
+        values = []
+        for row in complete:
+            try:
+                values.append(convert(row))
+            except ImportRowError as exc:
+                reject_writer.writerow({**row, "error": str(exc)})
+                rejected += 1
+
+        if values:
+            db.session.execute(model.__table__.insert(), values)
+            record_core_insert(model, values)
+        db.session.commit()
+        imported += len(values)
+    return imported, rejected
@@ -0,0 +1,95 @@
+"""The SQLAlchemy and Migrate extensions, SQLite engine profiles and session helpers."""
+from datetime import datetime
+
+from flask_migrate import Migrate
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm.attributes import get_history
+
+# --- SQLite engine profiles ---
+# PRAGMAs applied to every new connection, plus matching engine options.
+# "production" suits several gunicorn workers sharing one database file:
+# WAL lets readers run alongside the writer, busy_timeout makes writers
+# queue instead of failing with "database is locked", and synchronous=NORMAL
+# only fsyncs at checkpoints (safe in WAL mode).
+SQLITE_PROFILES = {
+    "default": {
+        "pragmas": {},
+        "engine_options": {},
+    },
+    "production": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 10000,  # ms
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,  # negative = KiB
+            "temp_store": "MEMORY",
+        },
+        "engine_options": {
+            "pool_size": 5,
+            "max_overflow": 10,
+            "pool_recycle": 3600,
+            "connect_args": {"timeout": 10},
+        },
+    },
+}
+
+
+def configure_sqlite_engine(engine, profile):
+    """Apply the PRAGMAs of SQLITE_PROFILES[profile] to each new connection of `engine`."""
+    pragmas = SQLITE_PROFILES[profile]["pragmas"]
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def sqlite_engine_options(uri, profile):
+    """Engine options of SQLITE_PROFILES[profile] that apply to the database at `uri`.
+
+    Only a file-backed SQLite database gets them: SQLAlchemy serves in-memory
+    SQLite from a single shared connection (StaticPool), which rejects
+    pool_size and max_overflow, and connect_args are sqlite3-specific.
+    """
+    url = make_url(uri)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:") \
+            or url.query.get("mode") == "memory":
+        return {}
+    return SQLITE_PROFILES[profile]["engine_options"]
+
+
+# Bound to each app by create_app
+db = SQLAlchemy()
+
+
+def include_in_migrations(name, type_, parent_names):
+    # FTS5 search indexes (and their shadow tables) are created with raw SQL; see SEARCH_INDEXES
+    return not (type_ == "table" and "_fts" in name)
+
+
+migrate = Migrate(include_name=include_in_migrations)
+
+
+def as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def committed_value(obj, attr):
+    """Value of `attr` as it was before this flush.
+
+    Only trustworthy for attributes mapped with active_history=True: an
+    assignment to an expired attribute otherwise leaves no old value behind.
+    """
+    history = get_history(obj, attr)
+    if history.deleted:
+        return history.deleted[0]
+    if history.added:
+        return None  # history doesn't record a None it replaced
+    return getattr(obj, attr)
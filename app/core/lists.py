@@ -0,0 +1,276 @@
+"""Keyset-paginated list queries, query-string filters and their JSON shapes."""
+from datetime import datetime
+
+from flask import abort, jsonify, request, url_for
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.search import search_filter
+from app.models import Entity, Relationship, RelationshipType, SupplyLog, Transaction, WorkLog
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        abort(400, f"{name} must be a YYYY-MM-DD date")
+
+
+def int_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, f"{name} must be an integer")
+
+
+def paid_arg():
+    value = request.args.get("paid")
+    if not value:
+        return None
+    if value not in ("0", "1"):
+        abort(400, "paid must be 0 or 1")
+    return value == "1"
+
+
+def keyset_page(query, id_col, date_col=None):
+    """Return one page of `query` (newest first) and the cursor for the next page.
+
+    The cursor is "<id>" for undated lists and "<YYYY-MM-DD>,<id>" for dated
+    ones. Seeking past the cursor instead of using OFFSET keeps every page
+    equally cheap, however deep into the history it is.
+    """
+    limit = min(max(int_arg("limit") or PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            if date_col is None:
+                query = query.filter(id_col < int(cursor))
+            else:
+                cursor_date, cursor_id = cursor.split(",")
+                cursor_date = datetime.strptime(cursor_date, "%Y-%m-%d").date()
+                cursor_id = int(cursor_id)
+                query = query.filter(or_(
+                    date_col < cursor_date,
+                    and_(date_col == cursor_date, id_col < cursor_id)
+                ))
+        except ValueError:
+            abort(400, "Invalid cursor")
+
+    if date_col is None:
+        query = query.order_by(id_col.desc())
+    else:
+        query = query.order_by(date_col.desc(), id_col.desc())
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = str(getattr(last, id_col.key))
+        if date_col is not None:
+            next_cursor = f"{getattr(last, date_col.key):%Y-%m-%d},{next_cursor}"
+    return rows, next_cursor
+
+
+def page_url(cursor=None):
+    """URL of the current list view with the same filters and the given cursor.
+
+    A template global (create_app registers it), used by _pager.html.
+    """
+    args = request.args.to_dict()
+    args.pop("cursor", None)
+    if cursor:
+        args["cursor"] = cursor
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def relationship_loaders():
+    """Eager-load options for templates that print "<entity> - <type>" per relationship."""
+    return (
+        joinedload(Relationship.entity),
+        joinedload(Relationship.relationship_type),
+    )
+
+
+def entity_page():
+    query = Entity.query
+    type_id = int_arg("type_id")
+    if type_id:
+        query = query.filter(Entity.relationships.any(Relationship.relationship_type_id == type_id))
+    query = search_filter(query, Entity, request.args.get("q"))
+    return keyset_page(query, Entity.id)
+
+
+def relationship_page():
+    query = Relationship.query.options(*relationship_loaders())
+    entity_id = int_arg("entity_id")
+    type_id = int_arg("type_id")
+    if entity_id:
+        query = query.filter(Relationship.entity_id == entity_id)
+    if type_id:
+        query = query.filter(Relationship.relationship_type_id == type_id)
+    return keyset_page(query, Relationship.id)
+
+
+def transaction_page():
+    query = Transaction.query.options(
+        joinedload(Transaction.transaction_type),
+        joinedload(Transaction.relationship).joinedload(Relationship.entity),
+        joinedload(Transaction.relationship).joinedload(Relationship.relationship_type),
+    )
+    start_date, end_date = date_arg("start_date"), date_arg("end_date")
+    relationship_id = int_arg("relationship_id")
+    type_id = int_arg("type_id")
+    if start_date:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date:
+        query = query.filter(Transaction.date <= end_date)
+    if relationship_id:
+        query = query.filter(Transaction.relationship_id == relationship_id)
+    if type_id:
+        query = query.filter(Transaction.transaction_type_id == type_id)
+    query = search_filter(query, Transaction, request.args.get("q"))
+    return keyset_page(query, Transaction.id, Transaction.date)
+
+
+def worklog_page():
+    query = WorkLog.query.options(
+        joinedload(WorkLog.work_type),
+        joinedload(WorkLog.relationship).joinedload(Relationship.entity),
+    )
+    start_date, end_date = date_arg("start_date"), date_arg("end_date")
+    relationship_id = int_arg("relationship_id")
+    type_id = int_arg("type_id")
+    paid = paid_arg()
+    if start_date:
+        query = query.filter(WorkLog.start_date >= start_date)
+    if end_date:
+        query = query.filter(WorkLog.start_date <= end_date)
+    if relationship_id:
+        query = query.filter(WorkLog.relationship_id == relationship_id)
+    if type_id:
+        query = query.filter(WorkLog.work_type_id == type_id)
+    if paid is not None:
+        query = query.filter(WorkLog.payroll_id.isnot(None) if paid else WorkLog.payroll_id.is_(None))
+    query = search_filter(query, WorkLog, request.args.get("q"))
+    return keyset_page(query, WorkLog.id, WorkLog.start_date)
+
+
+def supply_log_page():
+    query = SupplyLog.query.options(
+        joinedload(SupplyLog.supplier).joinedload(Relationship.entity),
+        joinedload(SupplyLog.supply_type),
+        joinedload(SupplyLog.payment),
+    )
+    start_date, end_date = date_arg("start_date"), date_arg("end_date")
+    relationship_id = int_arg("relationship_id")
+    type_id = int_arg("type_id")
+    paid = paid_arg()
+    if start_date:
+        query = query.filter(SupplyLog.date >= start_date)
+    if end_date:
+        query = query.filter(SupplyLog.date <= end_date)
+    if relationship_id:
+        query = query.filter(SupplyLog.supplier_id == relationship_id)
+    if type_id:
+        query = query.filter(SupplyLog.supply_type_id == type_id)
+    if paid is not None:
+        query = query.filter(SupplyLog.payment_id.isnot(None) if paid else SupplyLog.payment_id.is_(None))
+    query = search_filter(query, SupplyLog, request.args.get("q"))
+    return keyset_page(query, SupplyLog.id, SupplyLog.date)
+
+
+def entity_to_dict(e):
+    return {"id": e.id, "name": e.name, "email": e.email, "phone": e.phone, "address": e.address}
+
+
+def relationship_to_dict(r):
+    return {
+        "id": r.id,
+        "entity_id": r.entity_id,
+        "entity": r.entity.name,
+        "relationship_type_id": r.relationship_type_id,
+        "relationship_type": r.relationship_type.name,
+    }
+
+
+def transaction_to_dict(t):
+    return {
+        "id": t.id,
+        "date": t.date.strftime("%Y-%m-%d"),
+        "transaction_type_id": t.transaction_type_id,
+        "transaction_type": t.transaction_type.name,
+        "relationship_id": t.relationship_id,
+        "entity": t.relationship.entity.name,
+        "relationship_type": t.relationship.relationship_type.name,
+        "amount": t.amount,
+        "description": t.description,
+    }
+
+
+def worklog_to_dict(log):
+    return {
+        "id": log.id,
+        "start_date": log.start_date.strftime("%Y-%m-%d"),
+        "end_date": log.end_date.strftime("%Y-%m-%d"),
+        "work_type_id": log.work_type_id,
+        "work_type": log.work_type.name,
+        "relationship_id": log.relationship_id,
+        "entity": log.relationship.entity.name,
+        "work_units": log.work_units,
+        "due_payment": log.due_payment,
+        "payroll_id": log.payroll_id,
+        "description": log.description,
+    }
+
+
+def supply_log_to_dict(log):
+    return {
+        "id": log.id,
+        "date": log.date.strftime("%Y-%m-%d"),
+        "supplier_id": log.supplier_id,
+        "supplier": log.supplier.entity.name,
+        "supply_type_id": log.supply_type_id,
+        "supply_type": log.supply_type.name,
+        "unit_price": log.unit_price,
+        "units": log.units,
+        "amount": log.amount,
+        "payment_id": log.payment_id,
+        "description": log.description,
+    }
+
+
+def page_json(rows, next_cursor, to_dict):
+    return jsonify({"items": [to_dict(row) for row in rows], "next_cursor": next_cursor})
+
+
+def relationship_label(entity_name, type_id, with_type=True):
+    if not with_type:
+        return entity_name
+    rel_type = reference_data.get(RelationshipType, type_id)
+    return f"{entity_name} - {rel_type.name if rel_type else '?'}"
+
+
+def selected_relationship(arg="relationship_id", with_type=True):
+    """{"id", "label"} for the relationship named by a request arg, to pre-fill a typeahead."""
+    rel_id = int_arg(arg)
+    if not rel_id:
+        return None
+    row = (
+        db.session.query(Relationship.id, Entity.name, Relationship.relationship_type_id)
+        .join(Entity, Relationship.entity_id == Entity.id)
+        .filter(Relationship.id == rel_id)
+        .first()
+    )
+    return {"id": row.id, "label": relationship_label(row.name, row.relationship_type_id, with_type)} if row else None
@@ -0,0 +1,177 @@
+"""Request instrumentation.
+
+Every request records its route, SQL statement count, total and slowest
+statement time and template render time. Totals are kept per app and
+process (each gunicorn worker exposes its own) and served as Prometheus
+text on /metrics. Statements slower than SLOW_QUERY_MS are logged with the
+shape of their bound parameters (names and types, never values).
+"""
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from werkzeug.local import LocalProxy
+
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """Thread-safe per-route request totals, rendered in Prometheus text format."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.slow_queries = 0
+        self._routes = {}
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, method, status, seconds, sql_count, sql_seconds, sql_slowest, template_seconds):
+        with self._lock:
+            totals = self._routes.get((route, method))
+            if totals is None:
+                totals = self._routes[(route, method)] = {
+                    "count": 0, "seconds": 0.0, "buckets": [0] * len(self.buckets),
+                    "sql_count": 0, "sql_seconds": 0.0, "sql_slowest": 0.0, "template_seconds": 0.0,
+                }
+            totals["count"] += 1
+            totals["seconds"] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    totals["buckets"][i] += 1
+            totals["sql_count"] += sql_count
+            totals["sql_seconds"] += sql_seconds
+            totals["sql_slowest"] = max(totals["sql_slowest"], sql_slowest)
+            totals["template_seconds"] += template_seconds
+            key = (route, method, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def record_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self):
+        def labels(route, method, **extra):
+            pairs = [("route", route), ("method", method)] + list(extra.items())
+            return ",".join(f'{k}="{_prometheus_escape(v)}"' for k, v in pairs)
+
+        with self._lock:
+            routes = sorted((key, dict(totals, buckets=list(totals["buckets"])))
+                            for key, totals in self._routes.items())
+            statuses = sorted(self._statuses.items())
+            slow_queries = self.slow_queries
+
+        lines = [
+            "# HELP app_http_requests_total Requests handled, by route, method and status.",
+            "# TYPE app_http_requests_total counter",
+        ]
+        lines += [f"app_http_requests_total{{{labels(r, m, status=s)}}} {n}" for (r, m, s), n in statuses]
+
+        lines += [
+            "# HELP app_http_request_duration_seconds Time spent handling requests.",
+            "# TYPE app_http_request_duration_seconds histogram",
+        ]
+        for (route, method), totals in routes:
+            for bound, n in zip(self.buckets, totals["buckets"]):
+                lines.append(f'app_http_request_duration_seconds_bucket{{{labels(route, method, le=bound)}}} {n}')
+            lines.append(f'app_http_request_duration_seconds_bucket{{{labels(route, method, le="+Inf")}}} {totals["count"]}')
+            lines.append(f"app_http_request_duration_seconds_sum{{{labels(route, method)}}} {totals['seconds']:.6f}")
+            lines.append(f"app_http_request_duration_seconds_count{{{labels(route, method)}}} {totals['count']}")
+
+        for name, key, kind, help_text in (
+            ("app_sql_statements_total", "sql_count", "counter", "SQL statements executed while handling requests."),
+            ("app_sql_duration_seconds_total", "sql_seconds", "counter", "Time spent in SQL statements."),
+            ("app_sql_slowest_statement_seconds", "sql_slowest", "gauge", "Slowest single SQL statement seen."),
+            ("app_template_render_seconds_total", "template_seconds", "counter", "Time spent rendering templates."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{{{labels(r, m)}}} {totals[key]:.6g}" for (r, m), totals in routes]
+
+        lines += [
+            "# HELP app_slow_queries_total SQL statements slower than SLOW_QUERY_MS.",
+            "# TYPE app_slow_queries_total counter",
+            f"app_slow_queries_total {slow_queries}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def parameter_shape(parameters, executemany=False):
+    """Describe bound parameters by name/position and type, without their values."""
+    if executemany:
+        return f"{len(parameters)} x {parameter_shape(parameters[0]) if parameters else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in parameters or ()) + ")"
+
+
+# The current app's RequestMetrics; create_app puts one in app.extensions
+request_metrics = LocalProxy(lambda: current_app.extensions["request_metrics"])
+
+
+def instrument_engine(engine, slow_query_ms, metrics):
+    """Time every statement on `engine`, counting it towards the current request and `metrics`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement_time(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+        if has_request_context() and "sql_count" in g:
+            g.sql_count += 1
+            g.sql_seconds += elapsed
+            g.sql_slowest = max(g.sql_slowest, elapsed)
+        if elapsed * 1000 >= slow_query_ms:
+            metrics.record_slow_query()
+            current_app.logger.warning(
+                "Slow query (%.1f ms) on %s: %s params=%s",
+                elapsed * 1000,
+                request.path if has_request_context() else "<no request>",
+                statement,
+                parameter_shape(parameters, executemany),
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def discard_statement_timer(context):
+        # after_cursor_execute doesn't run for failed statements
+        if context.connection is not None and context.connection.info.get("statement_started"):
+            context.connection.info["statement_started"].pop()
+
+
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+
+def record_template_time(sender, template, context, **extra):
+    started = g.pop("template_started", None)
+    if started is not None and "template_seconds" in g:
+        g.template_seconds += time.perf_counter() - started
+
+
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_seconds = 0.0
+    g.sql_slowest = 0.0
+    g.template_seconds = 0.0
+
+
+def record_request_metrics(response):
+    # Streamed responses (exports) are recorded before their body is sent,
+    # so statements run by the generator don't show up here.
+    if "request_started" not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    request_metrics.record(route, request.method, response.status_code, elapsed,
+                           g.sql_count, g.sql_seconds, g.sql_slowest, g.template_seconds)
+    response.headers["Server-Timing"] = (
+        f'sql;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_count} statements", '
+        f"tpl;dur={g.template_seconds * 1000:.1f}, total;dur={elapsed * 1000:.1f}"
+    )
+    return response
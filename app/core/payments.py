@@ -0,0 +1,222 @@
+"""Payroll and supply payment runs: settle unpaid logs in bulk, one transaction per counterparty."""
+from datetime import date
+
+from sqlalchemy import bindparam, func
+
+from app.core.caches import dashboard_changes, reference_data
+from app.core.database import db
+from app.core.rollups import add_balance_delta, add_ledger_delta, apply_balance_deltas, apply_ledger_deltas
+from app.models import Entity, Payroll, Relationship, SupplyLog, SupplyPayment, Transaction, TransactionType, WorkLog
+
+
+# --- Payroll run ---
+class PayrollRunError(Exception):
+    pass
+
+
+def unpaid_worklog_totals(start_date, end_date, relationship_ids=None):
+    """Unpaid work per employee for worklogs starting in [start_date, end_date].
+
+    Returns (relationship_id, employee name, log count, total due, max log id)
+    rows; the max id pins down exactly which logs a payroll run will cover.
+    """
+    query = (
+        db.session.query(
+            WorkLog.relationship_id,
+            Entity.name,
+            func.count(WorkLog.id),
+            func.sum(WorkLog.due_payment),
+            func.max(WorkLog.id)
+        )
+        .join(Relationship, WorkLog.relationship_id == Relationship.id)
+        .join(Entity, Relationship.entity_id == Entity.id)
+        .filter(*unpaid_worklog_filters(start_date, end_date))
+        .group_by(WorkLog.relationship_id, Entity.name)
+        .order_by(Entity.name)
+    )
+    if relationship_ids:
+        query = query.filter(WorkLog.relationship_id.in_(relationship_ids))
+    return query.all()
+
+
+def unpaid_worklog_filters(start_date, end_date):
+    return [WorkLog.payroll_id.is_(None), WorkLog.start_date >= start_date, WorkLog.start_date <= end_date]
+
+
+def settle_unpaid_logs(totals, txn_type_name, error, log_model, counterparty, paid_by, payment_model,
+                       unpaid_filters, describe, noun, balance_fields):
+    """Pay each counterparty's unpaid logs with one Transaction + payment row.
+
+    `totals` are (counterparty id, name, log count, amount, max log id) rows
+    as made by unpaid_worklog_totals/unpaid_supply_totals. Everything happens
+    in one database transaction with a fixed number of statements however
+    many counterparties are paid: one multi-row INSERT each for the
+    Transactions and `payment_model` rows, and one executemany UPDATE
+    setting `paid_by` on the `log_model` rows matching `unpaid_filters`, up
+    to each counterparty's max id. `describe(count)` gives each
+    Transaction's description; `balance_fields` names the unpaid total and
+    count columns of RelationshipBalance the payment clears. Raises `error`
+    when the transaction type is missing or the logs changed underneath;
+    returns {counterparty id: transaction id}.
+    """
+    txn_type = reference_data.by_name(TransactionType, txn_type_name)
+    if not txn_type:
+        raise error(f"{txn_type_name} transaction type not found")
+    if not totals:
+        return {}
+
+    today = date.today()
+    # One transaction per counterparty, so RETURNING rows map back by relationship_id
+    transaction_ids = dict(db.session.execute(
+        Transaction.__table__.insert().returning(Transaction.relationship_id, Transaction.id),
+        [
+            {
+                "transaction_type_id": txn_type.id,
+                "relationship_id": counterparty_id,
+                "amount": amount,
+                "date": today,
+                "description": describe(count),
+            }
+            for counterparty_id, _, count, amount, _ in totals
+        ]
+    ).all())
+    payment_ids = dict(db.session.execute(
+        payment_model.__table__.insert().returning(payment_model.transaction_id, payment_model.id),
+        [{"transaction_id": txn_id} for txn_id in transaction_ids.values()]
+    ).all())
+
+    link_logs = (
+        log_model.__table__.update()
+        .where(counterparty == bindparam("counterparty_id"), log_model.id <= bindparam("max_id"), *unpaid_filters)
+        .values({paid_by.key: bindparam("new_payment_id")})
+    )
+    result = db.session.execute(link_logs, [
+        {"counterparty_id": counterparty_id, "max_id": max_id,
+         "new_payment_id": payment_ids[transaction_ids[counterparty_id]]}
+        for counterparty_id, _, _, _, max_id in totals
+    ])
+    if result.rowcount != sum(count for _, _, count, _, _ in totals):
+        db.session.rollback()
+        raise error(f"{noun.capitalize()} changed while the payment was running; nothing was paid")
+
+    # Core writes skip the after_flush hooks; keep the rollups and cache in step
+    unpaid_total, unpaid_count = balance_fields
+    deltas, balances = {}, {}
+    for counterparty_id, _, count, amount, _ in totals:
+        add_ledger_delta(deltas, today, txn_type.id, counterparty_id, amount, 1)
+        add_balance_delta(balances, counterparty_id, today,
+                          **{unpaid_total: -amount, unpaid_count: -count}, paid_total=amount)
+    apply_ledger_deltas(db.session.connection(), deltas)
+    apply_balance_deltas(db.session.connection(), balances)
+    dashboard_changes(db.session)["transaction_days"].add(today)
+    db.session.commit()
+    return transaction_ids
+
+
+def run_payroll(start_date, end_date, relationship_ids=None):
+    """Pay every unpaid worklog in the range, one Transaction + Payroll per employee.
+
+    A single database transaction through settle_unpaid_logs. Returns a list of
+    {"relationship_id", "employee", "worklogs", "amount", "transaction_id"}.
+    """
+    totals = unpaid_worklog_totals(start_date, end_date, relationship_ids)
+    description = f"Payroll {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
+    transaction_ids = settle_unpaid_logs(
+        totals, "Payroll", PayrollRunError, WorkLog, WorkLog.relationship_id, WorkLog.payroll_id, Payroll,
+        unpaid_worklog_filters(start_date, end_date),
+        describe=lambda count: f"{description} ({count} work logs)",
+        noun="work logs",
+        balance_fields=("unpaid_worklog_total", "unpaid_worklog_count"),
+    )
+    return [
+        {
+            "relationship_id": rel_id,
+            "employee": name,
+            "worklogs": count,
+            "amount": amount,
+            "transaction_id": transaction_ids[rel_id],
+        }
+        for rel_id, name, count, amount, _ in totals
+    ]
+
+
+# --- Supply payments ---
+class SupplyPaymentError(Exception):
+    pass
+
+
+def unpaid_supply_totals(start_date=None, end_date=None, supplier_ids=None, log_ids=None):
+    """Unpaid supply logs per supplier, optionally limited to a date range and/or given log ids.
+
+    Returns (supplier_id, supplier name, log count, total amount, max log id)
+    rows; the max id pins down exactly which logs a payment run will cover.
+    """
+    query = (
+        db.session.query(
+            SupplyLog.supplier_id,
+            Entity.name,
+            func.count(SupplyLog.id),
+            func.sum(SupplyLog.amount),
+            func.max(SupplyLog.id)
+        )
+        .join(Relationship, SupplyLog.supplier_id == Relationship.id)
+        .join(Entity, Relationship.entity_id == Entity.id)
+        .filter(*unpaid_supply_filters(start_date, end_date, log_ids))
+        .group_by(SupplyLog.supplier_id, Entity.name)
+        .order_by(Entity.name)
+    )
+    if supplier_ids:
+        query = query.filter(SupplyLog.supplier_id.in_(supplier_ids))
+    return query.all()
+
+
+def unpaid_supply_filters(start_date=None, end_date=None, log_ids=None):
+    filters = [SupplyLog.payment_id.is_(None)]
+    if start_date:
+        filters.append(SupplyLog.date >= start_date)
+    if end_date:
+        filters.append(SupplyLog.date <= end_date)
+    if log_ids is not None:
+        filters.append(SupplyLog.id.in_(log_ids))
+    return filters
+
+
+def payable_supply_log_count(supplier_id, log_ids):
+    """How many of `log_ids` are unpaid supply logs of `supplier_id`."""
+    return db.session.scalar(
+        db.select(func.count(SupplyLog.id))
+        .where(SupplyLog.supplier_id == supplier_id, *unpaid_supply_filters(log_ids=log_ids))
+    )
+
+
+def run_supply_payments(start_date=None, end_date=None, supplier_ids=None, log_ids=None, description=None):
+    """Settle unpaid supply logs with one Transaction + SupplyPayment per supplier.
+
+    Covers every unpaid log matching the date range, suppliers and log ids
+    given (all optional); description overrides the generated one. A single
+    database transaction through settle_unpaid_logs, like run_payroll.
+    Returns a list of
+    {"supplier_id", "supplier", "supply_logs", "amount", "transaction_id"}.
+    """
+    totals = unpaid_supply_totals(start_date, end_date, supplier_ids, log_ids)
+    if start_date and end_date:
+        label = f"Supply payment {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
+    else:
+        label = "Supply payment"
+    transaction_ids = settle_unpaid_logs(
+        totals, "Supply Payments", SupplyPaymentError, SupplyLog, SupplyLog.supplier_id, SupplyLog.payment_id,
+        SupplyPayment, unpaid_supply_filters(start_date, end_date, log_ids),
+        describe=lambda count: description if description is not None else f"{label} ({count} supply logs)",
+        noun="supply logs",
+        balance_fields=("unpaid_supply_total", "unpaid_supply_count"),
+    )
+    return [
+        {
+            "supplier_id": supplier_id,
+            "supplier": name,
+            "supply_logs": count,
+            "amount": amount,
+            "transaction_id": transaction_ids[supplier_id],
+        }
+        for supplier_id, name, count, amount, _ in totals
+    ]
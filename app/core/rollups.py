@@ -0,0 +1,481 @@
+"""Rollup tables kept current on every flush: the daily ledger, relationship
+balances and the supply type closure.
+
+Core INSERTs and DELETEs skip the flush hooks; callers bring the rollups in
+line with record_core_insert / record_core_delete in the same transaction.
+Each table has a rebuild function for repairs (see app.commands).
+"""
+from sqlalchemy import case, event, func, or_, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.core.caches import REFERENCE_MODELS, dashboard_changes, reference_data
+from app.core.database import as_date, committed_value, db
+from app.models import (
+    Entity, LedgerDaily, Relationship, RelationshipBalance, RelationshipType, SupplyLog, SupplyType,
+    SupplyTypeClosure, Transaction, TransactionType, WorkLog,
+)
+
+# --- Daily ledger rollup ---
+
+
+@event.listens_for(Session, "after_flush")
+def update_ledger_daily(session, flush_context):
+    # (day, transaction_type_id, relationship_id) -> [amount delta, count delta]
+    deltas = {}
+
+    def add(*args):
+        add_ledger_delta(deltas, *args)
+
+    tracked = ("date", "transaction_type_id", "relationship_id", "amount")
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            add(obj.date, obj.transaction_type_id, obj.relationship_id, obj.amount, 1)
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            old = [committed_value(obj, attr) for attr in tracked]
+            add(*old[:3], -old[3], -1)
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj, include_collections=False):
+            old = [committed_value(obj, attr) for attr in tracked]
+            new = [getattr(obj, attr) for attr in tracked]
+            if old != new:
+                add(*old[:3], -old[3], -1)
+                add(*new[:3], new[3], 1)
+    if deltas:
+        apply_ledger_deltas(session.connection(), deltas)
+
+
+def add_ledger_delta(deltas, day, type_id, relationship_id, amount, count):
+    # form posts may hand us ids as strings
+    key = (as_date(day), int(type_id), int(relationship_id))
+    delta = deltas.setdefault(key, [0.0, 0])
+    delta[0] += amount
+    delta[1] += count
+
+
+def apply_ledger_deltas(connection, deltas):
+    """Fold {(day, transaction_type_id, relationship_id): [amount, count]} into the rollup."""
+    relationship_ids = {key[2] for key in deltas}
+    relationship_types = dict(connection.execute(
+        db.select(Relationship.id, Relationship.relationship_type_id)
+        .where(Relationship.id.in_(relationship_ids))
+    ).all())
+
+    rows = {}
+    for (day, type_id, relationship_id), (amount, count) in deltas.items():
+        if relationship_id not in relationship_types:
+            continue  # orphaned by a relationship delete; the rebuild skips these too
+        key = (day, type_id, relationship_types[relationship_id])
+        row = rows.setdefault(key, {
+            "day": day,
+            "transaction_type_id": type_id,
+            "relationship_type_id": key[2],
+            "total_amount": 0.0,
+            "transaction_count": 0,
+        })
+        row["total_amount"] += amount
+        row["transaction_count"] += count
+    if not rows:
+        return
+
+    ledger = LedgerDaily.__table__
+    stmt = sqlite_insert(ledger)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ledger.c.day, ledger.c.transaction_type_id, ledger.c.relationship_type_id],
+        set_={
+            "total_amount": ledger.c.total_amount + stmt.excluded.total_amount,
+            "transaction_count": ledger.c.transaction_count + stmt.excluded.transaction_count,
+        }
+    )
+    connection.execute(stmt, list(rows.values()))
+
+
+def rebuild_ledger_daily():
+    """Recompute the whole ledger rollup from the transaction table."""
+    ledger = LedgerDaily.__table__
+    totals = (
+        db.select(
+            Transaction.date,
+            Transaction.transaction_type_id,
+            Relationship.relationship_type_id,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        )
+        .join(Relationship, Transaction.relationship_id == Relationship.id)
+        .group_by(Transaction.date, Transaction.transaction_type_id, Relationship.relationship_type_id)
+    )
+    db.session.execute(ledger.delete())
+    db.session.execute(ledger.insert().from_select(
+        ["day", "transaction_type_id", "relationship_type_id", "total_amount", "transaction_count"],
+        totals
+    ))
+    db.session.commit()
+
+
+# --- Relationship balances ---
+
+
+BALANCE_COUNTERS = (
+    "unpaid_worklog_total", "unpaid_worklog_count", "unpaid_supply_total", "unpaid_supply_count", "paid_total"
+)
+
+
+def add_balance_delta(deltas, relationship_id, day=None, **counters):
+    """Add counter deltas (and an activity date) for one relationship to `deltas`."""
+    delta = deltas.setdefault(int(relationship_id), dict.fromkeys(BALANCE_COUNTERS, 0))
+    delta.setdefault("last_activity", None)
+    for name, value in counters.items():
+        delta[name] += value
+    day = as_date(day)
+    if day is not None and (delta["last_activity"] is None or day > delta["last_activity"]):
+        delta["last_activity"] = day
+
+
+def add_worklog_balance(deltas, relationship_id, due_payment, payroll_id, day, sign=1):
+    if payroll_id is None:
+        add_balance_delta(deltas, relationship_id, day if sign > 0 else None,
+                          unpaid_worklog_total=sign * due_payment, unpaid_worklog_count=sign)
+    else:
+        add_balance_delta(deltas, relationship_id, day if sign > 0 else None, paid_total=sign * due_payment)
+
+
+def add_supply_balance(deltas, supplier_id, amount, payment_id, day, sign=1):
+    if payment_id is None:
+        add_balance_delta(deltas, supplier_id, day if sign > 0 else None,
+                          unpaid_supply_total=sign * amount, unpaid_supply_count=sign)
+    else:
+        add_balance_delta(deltas, supplier_id, day if sign > 0 else None, paid_total=sign * amount)
+
+
+@event.listens_for(Session, "after_flush")
+def update_relationship_balances(session, flush_context):
+    deltas = {}
+    removed_relationships = set()
+    balance_fields = {
+        WorkLog: (add_worklog_balance, ("relationship_id", "due_payment", "payroll_id", "end_date")),
+        SupplyLog: (add_supply_balance, ("supplier_id", "amount", "payment_id", "date")),
+    }
+
+    for obj in session.new:
+        if type(obj) in balance_fields:
+            add, fields = balance_fields[type(obj)]
+            add(deltas, *[getattr(obj, f) for f in fields])
+        elif isinstance(obj, Transaction):
+            add_balance_delta(deltas, obj.relationship_id, obj.date)
+    for obj in session.deleted:
+        if type(obj) in balance_fields:
+            add, fields = balance_fields[type(obj)]
+            add(deltas, *[committed_value(obj, f) for f in fields], sign=-1)
+        elif isinstance(obj, Relationship):
+            removed_relationships.add(obj.id)
+    for obj in session.dirty:
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        if type(obj) in balance_fields:
+            add, fields = balance_fields[type(obj)]
+            old = [committed_value(obj, f) for f in fields]
+            new = [getattr(obj, f) for f in fields]
+            if old != new:
+                add(deltas, *old, sign=-1)
+                add(deltas, *new)
+        elif isinstance(obj, Transaction):
+            add_balance_delta(deltas, obj.relationship_id, obj.date)
+
+    if deltas:
+        apply_balance_deltas(session.connection(), deltas)
+    if removed_relationships:
+        session.connection().execute(
+            RelationshipBalance.__table__.delete()
+            .where(RelationshipBalance.relationship_id.in_(removed_relationships))
+        )
+
+
+def apply_balance_deltas(connection, deltas):
+    """Fold {relationship_id: {counter: delta, ..., "last_activity": date}} into relationship_balance."""
+    balance = RelationshipBalance.__table__
+    stmt = sqlite_insert(balance)
+    set_ = {name: balance.c[name] + stmt.excluded[name] for name in BALANCE_COUNTERS}
+    set_["last_activity"] = func.max(
+        func.coalesce(balance.c.last_activity, stmt.excluded.last_activity),
+        func.coalesce(stmt.excluded.last_activity, balance.c.last_activity),
+    )
+    stmt = stmt.on_conflict_do_update(index_elements=[balance.c.relationship_id], set_=set_)
+    connection.execute(stmt, [
+        {"relationship_id": relationship_id, **delta} for relationship_id, delta in deltas.items()
+    ])
+
+
+def computed_relationship_balances():
+    """SELECT of every relationship's balance row, recomputed from the log and transaction tables."""
+    unpaid_worklog = WorkLog.payroll_id.is_(None)
+    unpaid_supply = SupplyLog.payment_id.is_(None)
+    contributions = db.union_all(
+        db.select(
+            WorkLog.relationship_id.label("relationship_id"),
+            case((unpaid_worklog, WorkLog.due_payment), else_=0.0).label("unpaid_worklog_total"),
+            case((unpaid_worklog, 1), else_=0).label("unpaid_worklog_count"),
+            db.literal(0.0).label("unpaid_supply_total"),
+            db.literal(0).label("unpaid_supply_count"),
+            case((unpaid_worklog, 0.0), else_=WorkLog.due_payment).label("paid_total"),
+            WorkLog.end_date.label("day"),
+        ),
+        db.select(
+            SupplyLog.supplier_id,
+            db.literal(0.0),
+            db.literal(0),
+            case((unpaid_supply, SupplyLog.amount), else_=0.0),
+            case((unpaid_supply, 1), else_=0),
+            case((unpaid_supply, 0.0), else_=SupplyLog.amount),
+            SupplyLog.date,
+        ),
+        db.select(
+            Transaction.relationship_id, db.literal(0.0), db.literal(0), db.literal(0.0), db.literal(0),
+            db.literal(0.0), Transaction.date,
+        ),
+    ).subquery()
+    return (
+        db.select(
+            contributions.c.relationship_id,
+            *[func.sum(contributions.c[name]).label(name) for name in BALANCE_COUNTERS],
+            func.max(contributions.c.day).label("last_activity"),
+        )
+        .join(Relationship, Relationship.id == contributions.c.relationship_id)
+        .group_by(contributions.c.relationship_id)
+    )
+
+
+def rebuild_relationship_balances():
+    """Recompute relationship_balance from scratch; returns how many stored rows were wrong."""
+    columns = ("relationship_id",) + BALANCE_COUNTERS + ("last_activity",)
+    balance = RelationshipBalance.__table__
+    stored = {row[0]: row for row in db.session.execute(db.select(*[balance.c[c] for c in columns]))}
+    fresh = {row[0]: row for row in db.session.execute(computed_relationship_balances())}
+
+    def same(a, b):
+        return a is not None and b is not None and all(
+            round(x, 2) == round(y, 2) if isinstance(x, float) or isinstance(y, float) else x == y
+            for x, y in zip(a, b)
+        )
+    wrong = sum(1 for rel_id in stored.keys() | fresh.keys() if not same(stored.get(rel_id), fresh.get(rel_id)))
+
+    db.session.execute(balance.delete())
+    if fresh:
+        db.session.execute(balance.insert(), [dict(zip(columns, row)) for row in fresh.values()])
+    db.session.commit()
+    return wrong
+
+
+def record_core_insert(model, values):
+    """Bring the ledger, balances and dashboard cache in line with rows just written by a Core INSERT.
+
+    Core inserts skip the after_flush hooks; call this in the same
+    transaction, before committing.
+    """
+    connection = db.session.connection()
+    balances = {}
+    if model is Relationship:
+        dashboard_changes(db.session)["relationships"] = True
+    elif model is Transaction:
+        deltas = {}
+        for v in values:
+            add_ledger_delta(deltas, v["date"], v["transaction_type_id"], v["relationship_id"], v["amount"], 1)
+            add_balance_delta(balances, v["relationship_id"], v["date"])
+        apply_ledger_deltas(connection, deltas)
+        dashboard_changes(db.session)["transaction_days"].update(as_date(v["date"]) for v in values)
+    elif model is WorkLog:
+        for v in values:
+            add_worklog_balance(balances, v["relationship_id"], v["due_payment"], v.get("payroll_id"), v["end_date"])
+    elif model is SupplyLog:
+        for v in values:
+            add_supply_balance(balances, v["supplier_id"], v["amount"], v.get("payment_id"), v["date"])
+    if balances:
+        apply_balance_deltas(connection, balances)
+
+
+def record_core_delete(model, rows):
+    """Take rows about to be removed by a Core DELETE out of the ledger, balances and caches.
+
+    The counterpart of `record_core_insert`: `rows` are the rows' column
+    mappings, read before deleting. Call it in the same transaction, while
+    the rows' relationships still exist.
+    """
+    connection = db.session.connection()
+    balances = {}
+    if model in REFERENCE_MODELS:
+        db.session.info.setdefault("reference_changes", set()).add(model)
+    if model in (Relationship, RelationshipType):
+        dashboard_changes(db.session)["relationships"] = True
+    elif model is TransactionType:
+        dashboard_changes(db.session)["all_transactions"] = True
+    elif model is Transaction:
+        deltas = {}
+        for r in rows:
+            add_ledger_delta(deltas, r["date"], r["transaction_type_id"], r["relationship_id"], -r["amount"], -1)
+        apply_ledger_deltas(connection, deltas)
+        dashboard_changes(db.session)["transaction_days"].update(as_date(r["date"]) for r in rows)
+    elif model is WorkLog:
+        for r in rows:
+            add_worklog_balance(balances, r["relationship_id"], r["due_payment"], r["payroll_id"], r["end_date"], sign=-1)
+    elif model is SupplyLog:
+        for r in rows:
+            add_supply_balance(balances, r["supplier_id"], r["amount"], r["payment_id"], r["date"], sign=-1)
+    if balances:
+        apply_balance_deltas(connection, balances)
+
+
+def amounts_owed(type_id=None):
+    """Relationships we owe money, largest balance first; reads only relationship_balance."""
+    owed = RelationshipBalance.unpaid_worklog_total + RelationshipBalance.unpaid_supply_total
+    query = (
+        db.session.query(RelationshipBalance, Relationship.entity_id, Relationship.relationship_type_id, Entity.name)
+        .join(Relationship, RelationshipBalance.relationship_id == Relationship.id)
+        .join(Entity, Relationship.entity_id == Entity.id)
+        .filter(owed > 0.005)
+    )
+    if type_id:
+        query = query.filter(Relationship.relationship_type_id == type_id)
+    rows = []
+    for balance, entity_id, rel_type_id, name in query.order_by(owed.desc(), RelationshipBalance.relationship_id):
+        rel_type = reference_data.get(RelationshipType, rel_type_id)
+        rows.append({
+            "relationship_id": balance.relationship_id,
+            "entity_id": entity_id,
+            "entity": name,
+            "relationship_type": rel_type.name if rel_type else None,
+            "unpaid_worklog_total": balance.unpaid_worklog_total,
+            "unpaid_worklog_count": balance.unpaid_worklog_count,
+            "unpaid_supply_total": balance.unpaid_supply_total,
+            "unpaid_supply_count": balance.unpaid_supply_count,
+            "owed_total": balance.owed_total,
+            "paid_total": balance.paid_total,
+            "last_activity": balance.last_activity.strftime("%Y-%m-%d") if balance.last_activity else None,
+        })
+    return rows
+
+
+# --- Supply type tree (closure table) ---
+
+
+def _closure_attach(connection, node_id, parent_id):
+    """Link node_id's subtree (already self-linked) under every ancestor of parent_id."""
+    connection.execute(text(
+        "INSERT INTO supply_type_closure (ancestor_id, descendant_id, depth) "
+        "SELECT up.ancestor_id, down.descendant_id, up.depth + down.depth + 1 "
+        "FROM supply_type_closure up, supply_type_closure down "
+        "WHERE up.descendant_id = :parent_id AND down.ancestor_id = :node_id"
+    ), {"parent_id": parent_id, "node_id": node_id})
+
+
+def _closure_detach(connection, node_id):
+    """Cut node_id's subtree off from everything above node_id."""
+    connection.execute(text(
+        "DELETE FROM supply_type_closure "
+        "WHERE descendant_id IN (SELECT descendant_id FROM supply_type_closure WHERE ancestor_id = :node_id) "
+        "AND ancestor_id NOT IN (SELECT descendant_id FROM supply_type_closure WHERE ancestor_id = :node_id)"
+    ), {"node_id": node_id})
+
+
+def optional_id(value):
+    return int(value) if value not in (None, "") else None
+
+
+@event.listens_for(Session, "after_flush")
+def update_supply_type_closure(session, flush_context):
+    new = [obj for obj in session.new if isinstance(obj, SupplyType)]
+    moved = [
+        obj for obj in session.dirty
+        if isinstance(obj, SupplyType) and get_history(obj, "parent_id").has_changes()
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, SupplyType)]
+    if not (new or moved or deleted):
+        return
+
+    connection = session.connection()
+    closure = SupplyTypeClosure.__table__
+    for obj in deleted:
+        connection.execute(closure.delete().where(
+            or_(closure.c.ancestor_id == obj.id, closure.c.descendant_id == obj.id)
+        ))
+
+    # Insert parents before their children when both are new in this flush
+    pending = {obj.id: obj for obj in new}
+    while pending:
+        ready = [obj for obj in pending.values() if optional_id(obj.parent_id) not in pending]
+        for obj in ready:
+            connection.execute(closure.insert().values(ancestor_id=obj.id, descendant_id=obj.id, depth=0))
+            if obj.parent_id:
+                _closure_attach(connection, obj.id, optional_id(obj.parent_id))
+            del pending[obj.id]
+
+    for obj in moved:
+        _closure_detach(connection, obj.id)
+        if obj.parent_id:
+            _closure_attach(connection, obj.id, optional_id(obj.parent_id))
+
+
+def rebuild_supply_type_closure():
+    """Recompute the closure table from supply_type.parent_id."""
+    db.session.execute(SupplyTypeClosure.__table__.delete())
+    db.session.execute(text(
+        "INSERT INTO supply_type_closure (ancestor_id, descendant_id, depth) "
+        "WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS ("
+        "  SELECT id, id, 0 FROM supply_type"
+        "  UNION ALL"
+        "  SELECT tree.ancestor_id, child.id, tree.depth + 1"
+        "  FROM tree JOIN supply_type child ON child.parent_id = tree.descendant_id"
+        ") SELECT ancestor_id, descendant_id, depth FROM tree"
+    ))
+    db.session.commit()
+
+
+def is_supply_type_descendant(node_id, ancestor_id):
+    return db.session.query(
+        SupplyTypeClosure.query.filter_by(ancestor_id=ancestor_id, descendant_id=node_id).exists()
+    ).scalar()
+
+
+def supply_type_totals(start_date=None, end_date=None):
+    """Supply log totals per supply type, for the type alone and for its whole subtree.
+
+    One grouped query over the closure table regardless of tree depth.
+    Returns {supply_type_id: {"amount", "units", "logs", "own_amount", "own_units", "own_logs"}}.
+    """
+    own = SupplyTypeClosure.depth == 0
+    query = (
+        db.session.query(
+            SupplyTypeClosure.ancestor_id,
+            func.sum(SupplyLog.amount),
+            func.sum(SupplyLog.units),
+            func.count(SupplyLog.id),
+            func.sum(case((own, SupplyLog.amount), else_=0.0)),
+            func.sum(case((own, SupplyLog.units), else_=0.0)),
+            func.sum(case((own, 1), else_=0))
+        )
+        .join(SupplyLog, SupplyLog.supply_type_id == SupplyTypeClosure.descendant_id)
+        .group_by(SupplyTypeClosure.ancestor_id)
+    )
+    if start_date:
+        query = query.filter(SupplyLog.date >= start_date)
+    if end_date:
+        query = query.filter(SupplyLog.date <= end_date)
+    keys = ("amount", "units", "logs", "own_amount", "own_units", "own_logs")
+    return {row[0]: dict(zip(keys, row[1:])) for row in query}
+
+
+def supply_type_tree_rows(totals):
+    """Supply types in tree order (parents before children) with depth and totals."""
+    types = reference_data.all(SupplyType)
+    children = {}
+    for st in types:
+        children.setdefault(st.parent_id, []).append(st)
+    empty = {"amount": 0.0, "units": 0.0, "logs": 0, "own_amount": 0.0, "own_units": 0.0, "own_logs": 0}
+    rows = []
+    stack = [(st, 0) for st in reversed(children.get(None, []))]
+    while stack:
+        st, depth = stack.pop()
+        rows.append({"id": st.id, "name": st.name, "parent_id": st.parent_id, "depth": depth,
+                     **totals.get(st.id, empty)})
+        stack.extend((child, depth + 1) for child in reversed(children.get(st.id, [])))
+    return rows
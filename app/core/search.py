@@ -0,0 +1,86 @@
+"""Full-text search (SQLite FTS5).
+
+Each searchable table has an external-content FTS5 index (<table>_fts)
+kept in sync by AFTER INSERT/UPDATE/DELETE triggers, so ORM writes, Core
+bulk inserts and raw SQL all stay indexed. The indexes are created by the
+add_fts_search migration, and by create_all() for fresh databases.
+"""
+import re
+from collections import OrderedDict
+
+from sqlalchemy import Integer, column, event, text
+
+from app.core.database import db
+
+SEARCH_INDEXES = OrderedDict([
+    ("entities", ("entity", ["name", "email", "phone", "address"])),
+    ("transactions", ("transaction", ["description"])),
+    ("worklogs", ("work_log", ["description"])),
+    ("supply_logs", ("supply_log", ["description"])),
+])
+
+
+def search_index_ddl(table, columns):
+    """CREATE statements for the FTS5 index over `columns` of `table` and its sync triggers."""
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{table}" BEGIN {insert_new} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{table}" BEGIN {delete_old} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON "{table}" BEGIN {delete_old} {insert_new} END',
+    ]
+
+
+@event.listens_for(db.metadata, "after_create")
+def create_search_indexes(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for table, columns in SEARCH_INDEXES.values():
+        for statement in search_index_ddl(table, columns):
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def drop_search_indexes(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    for table, _ in SEARCH_INDEXES.values():
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+def rebuild_search_indexes():
+    """Re-read every FTS5 index from its content table."""
+    for table, _ in SEARCH_INDEXES.values():
+        db.session.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def fts_match(q):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Quoting each word keeps user input from being parsed as FTS5 syntax
+    (AND/OR/NEAR, column filters, stray quotes). Returns None if q has no words.
+    """
+    words = re.findall(r"\w+", q or "")
+    if not words:
+        return None
+    return " ".join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+def search_filter(query, model, q):
+    """Restrict `query` to rows of `model` whose search index matches q."""
+    match = fts_match(q)
+    if match is None:
+        return query
+    fts = f"{model.__table__.name}_fts"
+    return query.filter(model.id.in_(
+        text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :search_match")
+        .bindparams(search_match=match)
+        .columns(column("rowid", Integer))
+    ))
@@ -0,0 +1,38 @@
+"""Default reference data."""
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.caches import reference_data
+from app.core.database import db
+from app.models import RelationshipType, TransactionType, WorkType
+
+
+DEFAULT_RELATIONSHIP_TYPES = [
+    {"name": "Employee", "description": "Person working for the business"},
+    {"name": "Customer", "description": "Person or organization buying products/services"},
+    {"name": "Supplier", "description": "Entity providing goods/services to the business"},
+]
+
+DEFAULT_WORKTYPES = [
+    {"name": "Excavator Operator", "description": "Operates excavators", "pay_type": "Hourly", "rate": 500},
+    {"name": "Labour", "description": "General plantation labour", "pay_type": "Daily", "rate": 2000},
+    {"name": "Mason", "description": "Handles construction work", "pay_type": "Daily", "rate": 2500},
+]
+
+DEFAULT_TRANSACTION_TYPES = [
+    {"name": "Payroll", "description": "Payments for employee work logs"},
+    {"name": "Supply Payments", "description" : "Payments for supplier done for supply log entries"}
+]
+
+
+def seed_defaults():
+    """Insert any missing default types in one transaction; existing rows are left alone."""
+    for model, rows in (
+        (RelationshipType, DEFAULT_RELATIONSHIP_TYPES),
+        (WorkType, DEFAULT_WORKTYPES),
+        (TransactionType, DEFAULT_TRANSACTION_TYPES),
+    ):
+        db.session.execute(
+            sqlite_insert(model.__table__).values(rows).on_conflict_do_nothing(index_elements=["name"])
+        )
+    db.session.commit()
+    reference_data.invalidate()
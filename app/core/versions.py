@@ -0,0 +1,114 @@
+"""Table versions and conditional GET.
+
+Each commit bumps a counter for every table it wrote to, in the same
+transaction, so all worker processes share one view of what changed.
+Read-mostly GET routes list the models they render from; their ETag
+hashes those tables' counters with the request URL, and a request whose
+If-None-Match still matches gets a 304 after one small counter lookup,
+before the route runs any of its own queries.
+"""
+import hashlib
+import os
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.sql.expression import UpdateBase
+
+from app.core.database import db
+from app.models import TableVersion
+
+
+def track_table_writes(engine):
+    """Collect the tables each connection writes to and bump their versions as it commits."""
+
+    @event.listens_for(engine, "after_execute")
+    def record_written_table(conn, clauseelement, multiparams, params, execution_options, result):
+        # ORM flushes, query.update()/delete() and Core DML all arrive here;
+        # raw text() writes (FTS and closure maintenance) don't need tracking
+        if isinstance(clauseelement, UpdateBase) and clauseelement.table.name != TableVersion.__tablename__:
+            conn.info.setdefault("written_tables", set()).add(clauseelement.table.name)
+
+    @event.listens_for(engine, "commit")
+    def bump_table_versions(conn):
+        written = conn.info.pop("written_tables", None)
+        if written and has_app_context():
+            g.pop("table_versions", None)
+        # Alembic migrations run on this engine too, possibly before
+        # table_version exists; a schema change comes with a deploy, which
+        # changes every ETag through code_version() anyway
+        if not written or "alembic_version" in written:
+            return
+        versions = TableVersion.__table__
+        stmt = sqlite_insert(versions)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[versions.c.name],
+            set_={"version": versions.c.version + 1}
+        )
+        # New counters start from the clock, so a recreated database never
+        # hands out a version (and ETag) that an old page was served with
+        start = time.time_ns() // 1000
+        conn.execute(stmt, [{"name": name, "version": start} for name in sorted(written)])
+
+    @event.listens_for(engine, "rollback")
+    def discard_written_tables(conn):
+        conn.info.pop("written_tables", None)
+
+
+def code_version(app):
+    """Newest modification time of the app package's code and templates, so a deploy changes every ETag."""
+    paths = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(app.root_path)
+        for name in names
+        if name.endswith((".py", ".html"))
+    ]
+    return str(max(int(os.path.getmtime(path)) for path in paths))
+
+
+def table_versions(tables):
+    """Current version of each table name in `tables`; 0 for tables never written.
+
+    Read at most once per app context (so per request) and again after
+    each commit, so the ETag and the caches checked against it agree.
+    """
+    known = g.setdefault("table_versions", {}) if has_app_context() else {}
+    missing = [name for name in tables if name not in known]
+    if missing:
+        stored = dict(db.session.execute(
+            db.select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(missing))
+        ).all())
+        known.update((name, stored.get(name, 0)) for name in missing)
+    return [known[name] for name in tables]
+
+
+def conditional_get(*models, key=None):
+    """Give GET responses of the decorated view an ETag over the versions of `models`' tables.
+
+    `key` returns anything else the page depends on (e.g. today's date for
+    pages that default to it). Other methods pass straight through.
+    """
+    tables = sorted(model.__table__.name for model in models)
+
+    def decorate(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+            parts = [current_app.config["ETAG_SALT"], request.full_path, *table_versions(tables)]
+            if key:
+                parts.append(key())
+            etag = hashlib.sha1(repr(parts).encode()).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = "no-cache"  # always revalidate
+            return response
+        return wrapper
+    return decorate
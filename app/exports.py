@@ -0,0 +1,126 @@
+"""Streaming CSV and NDJSON exports of the list tables."""
+import csv
+import io
+import json
+from datetime import date
+
+from flask import Blueprint, Response, abort, stream_with_context
+
+from app.core.database import db
+from app.core.lists import date_arg
+from app.models import (
+    Entity, Relationship, RelationshipType, SupplyLog, SupplyType, Transaction, TransactionType, WorkLog, WorkType,
+)
+
+bp = Blueprint("exports", __name__)
+
+
+EXPORT_CHUNK_ROWS = 500
+
+
+def export_select(kind):
+    """Flat SELECT for an export, plus the date column its range filter applies to."""
+    if kind == "transactions":
+        stmt = (
+            db.select(
+                Transaction.id,
+                Transaction.date,
+                TransactionType.name.label("transaction_type"),
+                Entity.name.label("entity"),
+                RelationshipType.name.label("relationship_type"),
+                Transaction.amount,
+                Transaction.description
+            )
+            .join(TransactionType, Transaction.transaction_type_id == TransactionType.id)
+            .join(Relationship, Transaction.relationship_id == Relationship.id)
+            .join(Entity, Relationship.entity_id == Entity.id)
+            .join(RelationshipType, Relationship.relationship_type_id == RelationshipType.id)
+        )
+        return stmt, Transaction.date, Transaction.id
+    if kind == "worklogs":
+        stmt = (
+            db.select(
+                WorkLog.id,
+                WorkLog.start_date,
+                WorkLog.end_date,
+                Entity.name.label("employee"),
+                WorkType.name.label("work_type"),
+                WorkLog.work_units,
+                WorkLog.due_payment,
+                WorkLog.payroll_id,
+                WorkLog.description
+            )
+            .join(WorkType, WorkLog.work_type_id == WorkType.id)
+            .join(Relationship, WorkLog.relationship_id == Relationship.id)
+            .join(Entity, Relationship.entity_id == Entity.id)
+        )
+        return stmt, WorkLog.start_date, WorkLog.id
+    if kind == "supply_logs":
+        stmt = (
+            db.select(
+                SupplyLog.id,
+                SupplyLog.date,
+                Entity.name.label("supplier"),
+                SupplyType.name.label("supply_type"),
+                SupplyLog.unit_price,
+                SupplyLog.units,
+                SupplyLog.amount,
+                SupplyLog.payment_id,
+                SupplyLog.description
+            )
+            .join(SupplyType, SupplyLog.supply_type_id == SupplyType.id)
+            .join(Relationship, SupplyLog.supplier_id == Relationship.id)
+            .join(Entity, Relationship.entity_id == Entity.id)
+        )
+        return stmt, SupplyLog.date, SupplyLog.id
+    abort(404)
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+@bp.route("/export/<kind>.<fmt>")
+def export(kind, fmt):
+    """Stream a table as CSV or NDJSON, oldest first, optionally limited to a date range.
+
+    Rows are pulled from the cursor in EXPORT_CHUNK_ROWS batches and written
+    out as they arrive, so memory use doesn't grow with the export size.
+    """
+    if fmt not in ("csv", "ndjson"):
+        abort(404)
+    stmt, date_col, id_col = export_select(kind)
+    start_date, end_date = date_arg("start_date"), date_arg("end_date")
+    if start_date:
+        stmt = stmt.where(date_col >= start_date)
+    if end_date:
+        stmt = stmt.where(date_col <= end_date)
+    stmt = stmt.order_by(date_col, id_col).execution_options(yield_per=EXPORT_CHUNK_ROWS)
+
+    def generate():
+        result = db.session.execute(stmt)
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+        for chunk in result.partitions():
+            for row in chunk:
+                values = [_export_value(v) for v in row]
+                if fmt == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values))) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    filename = f"{kind}.{fmt}"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -0,0 +1,171 @@
+"""Background jobs.
+
+Slow operations (force deletes, payroll and supply payment runs) run on a
+small thread pool instead of the request thread. The route records a Job
+row, hands its id to the pool and returns straight away; the page then
+polls /api/jobs/<id> until the job has finished. Progress written by a
+handler becomes visible whenever the handler commits, so handlers that
+work in chunks report as they go and single-transaction ones jump to done.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, render_template, url_for
+from sqlalchemy import and_, or_
+
+from app.core.database import db
+from app.core.payments import PayrollRunError, SupplyPaymentError
+from app.models import Job
+
+bp = Blueprint("jobs", __name__)
+
+
+class JobError(Exception):
+    pass
+
+
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    """Register `func(job, **params)` as the handler for jobs of `kind`.
+
+    Whatever it returns (JSON-serialisable) is stored as the job result;
+    exceptions mark the job failed with the exception message.
+    """
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def init_job_executor(app):
+    """Give `app` its own thread pool of JOB_WORKERS threads; with 0, jobs run inline."""
+    workers = app.config["JOB_WORKERS"]
+    app.extensions["job_executor"] = \
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job") if workers > 0 else None
+
+
+def submit_job(kind, **params):
+    """Queue a `kind` job and return its id; runs inline when JOB_WORKERS is 0."""
+    if kind not in JOB_HANDLERS:
+        raise KeyError(kind)
+    job = Job(kind=kind, params=json.dumps(params, default=str))
+    db.session.add(job)
+    db.session.commit()
+    app = current_app._get_current_object()
+    executor = app.extensions["job_executor"]
+    if executor is not None:
+        executor.submit(run_job, app, job.id)
+    else:
+        run_job(app, job.id)
+    return job.id
+
+
+def stale_job_cutoff():
+    return datetime.utcnow() - timedelta(seconds=current_app.config["JOB_STALE_AFTER"])
+
+
+def fail_stale_jobs(job_ids=None):
+    """Mark jobs queued or running for longer than JOB_STALE_AFTER failed.
+
+    Jobs only run in the executor of the process that queued them, so one
+    left unfinished that long was lost with a worker that stopped or
+    restarted and will never finish. Covers all such jobs, or just those in
+    `job_ids`; returns how many were failed.
+    """
+    cutoff = stale_job_cutoff()
+    query = Job.__table__.update().where(or_(
+        and_(Job.status == "queued", Job.created_at < cutoff),
+        and_(Job.status == "running", Job.started_at < cutoff),
+    ))
+    if job_ids is not None:
+        query = query.where(Job.id.in_(job_ids))
+    failed = db.session.execute(query.values(
+        status="failed", error="Abandoned: the worker running it stopped before it finished",
+        finished_at=datetime.utcnow()
+    )).rowcount
+    db.session.commit()
+    return failed
+
+
+def run_job(app, job_id):
+    """Claim job `job_id` and run its handler in a fresh context of `app`.
+
+    Claiming first fails any abandoned jobs, so they don't sit in the jobs
+    list as queued or running forever.
+    """
+    with app.app_context():
+        fail_stale_jobs()
+        claimed = db.session.execute(
+            Job.__table__.update()
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", started_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return
+
+        job = db.session.get(Job, job_id)
+        try:
+            result = JOB_HANDLERS[job.kind](job, **json.loads(job.params))
+        except Exception as exc:
+            db.session.rollback()
+            if not isinstance(exc, (PayrollRunError, SupplyPaymentError, JobError)):
+                current_app.logger.exception("Job %s (%s) failed", job_id, job.kind)
+            job = db.session.get(Job, job_id)
+            job.status, job.error = "failed", str(exc) or type(exc).__name__
+        else:
+            job = db.session.get(Job, job_id)
+            job.status, job.result = "succeeded", json.dumps(result, default=str)
+            if job.progress_total is not None:
+                job.progress_done = job.progress_total
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+def job_to_dict(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress_done": job.progress_done,
+        "progress_total": job.progress_total,
+        "message": job.message,
+        "result": job.result_data,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": url_for("jobs.api_job", job_id=job.id),
+    }
+
+
+def job_accepted(job_id):
+    """202 response for a route that handed its work to a job."""
+    response = jsonify(job_to_dict(db.session.get(Job, job_id)))
+    response.status_code = 202
+    response.headers["Location"] = url_for("jobs.api_job", job_id=job_id)
+    return response
+
+
+@bp.route("/api/jobs/<int:job_id>")
+@bp.route("/api/v1/jobs/<int:job_id>")
+def api_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    # Checked here first: polled every second, and a no-op UPDATE still
+    # takes SQLite's write lock
+    if job.abandoned(stale_job_cutoff()):
+        fail_stale_jobs([job_id])
+    return jsonify(job_to_dict(job))
+
+
+@bp.route("/jobs")
+def jobs():
+    recent = Job.query.order_by(Job.id.desc()).limit(50).all()
+    cutoff = stale_job_cutoff()
+    abandoned = [job.id for job in recent if job.abandoned(cutoff)]
+    if abandoned and fail_stale_jobs(abandoned):
+        recent = Job.query.order_by(Job.id.desc()).limit(50).all()
+    return render_template("jobs.html", title="Jobs", jobs=recent)
@@ -0,0 +1,344 @@
+"""Database models; the rollup tables are kept current by the session hooks in app.core."""
+import json
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.core.database import db
+
+# --- Entity Model ---
+class Entity(db.Model):
+    id = db.Column(db.Integer, primary_key=True)  # Unique ID
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), nullable=False, unique=True)
+    phone = db.Column(db.String(20), nullable=False)
+    address = db.Column(db.String(200), nullable=True)  # New attribut
+
+    __table_args__ = (
+        # Case-insensitive name prefix lookups (typeahead): name LIKE 'abc%'
+        db.Index("ix_entity_name_nocase", name.collate("NOCASE")),
+    )
+
+    def __repr__(self):
+        return f"<Entity {self.name}>"
+
+class RelationshipType(db.Model):
+    __tablename__ = "relationship_type"
+    id = db.Column(db.Integer, primary_key=True)  # Unique ID
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    description = db.Column(db.String(250), nullable=True)
+
+    def __repr__(self):
+        return f"<RelationshipType {self.name}>"
+
+class Relationship(db.Model):
+    __tablename__ = "relationship"
+    __table_args__ = (
+        db.Index("ix_relationship_entity_id", "entity_id"),
+        db.Index("ix_relationship_type_entity", "relationship_type_id", "entity_id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)  # Unique ID
+    entity_id = db.Column(db.Integer, db.ForeignKey('entity.id'), nullable=False)
+    relationship_type_id = db.Column(db.Integer, db.ForeignKey('relationship_type.id'), nullable=False)
+
+    entity = db.relationship('Entity', backref='relationships')
+    relationship_type = db.relationship('RelationshipType')
+
+    def __repr__(self):
+        return f"<Relationship {self.entity.name} - {self.relationship_type.name}>"
+
+# --- TransactionType Model ---
+class TransactionType(db.Model):
+    __tablename__ = "transaction_type"
+    id = db.Column(db.Integer, primary_key=True)  # Unique ID
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    description = db.Column(db.String(250), nullable=True)
+
+    def __repr__(self):
+        return f"<TransactionType {self.name}>"
+
+class Transaction(db.Model):
+    __tablename__ = "transaction"
+    __table_args__ = (
+        # Covers the dashboard's date-range SUM(amount) GROUP BY type without touching the table
+        db.Index("ix_transaction_date_type_amount", "date", "transaction_type_id", "amount"),
+        db.Index("ix_transaction_relationship_date", "relationship_id", "date"),
+        db.Index("ix_transaction_type_date", "transaction_type_id", "date"),
+    )
+    id = db.Column(db.Integer, primary_key=True)  # Unique ID
+    # The ledger and balance rollups need the old value of these when they
+    # change, so an assignment loads it first (see app.core.rollups)
+    transaction_type_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('transaction_type.id'), nullable=False), active_history=True
+    )
+    relationship_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('relationship.id'), nullable=False), active_history=True
+    )
+    amount = db.column_property(db.Column(db.Float, nullable=False), active_history=True)
+    date = db.column_property(db.Column(db.Date, nullable=False, default=datetime.utcnow), active_history=True)
+    description = db.Column(db.String(250), nullable=True)
+
+    # Relationships
+    transaction_type = db.relationship('TransactionType')
+    relationship = db.relationship('Relationship')
+    payrolls = db.relationship("Payroll", backref="parent_transaction", lazy=True)
+
+    def __repr__(self):
+        return f"<Transaction {self.id} - {self.transaction_type.name} - {self.amount}>"
+
+class WorkType(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    description = db.Column(db.String(250))
+    pay_type = db.Column(db.String(20), nullable=False)  # Hourly, Daily, Weekly, Monthly
+    rate = db.Column(db.Float, nullable=False, default=0.0)
+
+class WorkLog(db.Model):
+    __table_args__ = (
+        db.Index("ix_work_log_relationship_start", "relationship_id", "start_date"),
+        db.Index("ix_work_log_start_date", "start_date"),
+        db.Index("ix_work_log_work_type_start", "work_type_id", "start_date"),
+        db.Index("ix_work_log_payroll_id", "payroll_id"),
+        # Unpaid worklogs per employee (api_unpaid_worklogs, payroll)
+        db.Index(
+            "ix_work_log_unpaid",
+            "relationship_id", "start_date",
+            sqlite_where=text("payroll_id IS NULL")
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    work_type_id = db.Column(db.Integer, db.ForeignKey('work_type.id'), nullable=False)
+    relationship_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('relationship.id'), nullable=False), active_history=True
+    )
+    work_units = db.Column(db.Float, nullable=False)
+    due_payment = db.column_property(db.Column(db.Float, nullable=False), active_history=True)
+    # Link each worklog to a payroll (optional until paid)
+    payroll_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey("payroll.id"), nullable=True), active_history=True
+    )
+    payroll = db.relationship("Payroll", back_populates="worklogs") 
+
+    description = db.Column(db.String(250)) 
+
+    work_type = db.relationship("WorkType", backref="work_logs")
+    relationship = db.relationship("Relationship", backref="work_logs")
+    #transaction = db.relationship("Transaction", backref="work_logs")
+    #payrolls = db.relationship("Payroll", backref="worklog", lazy=True)
+
+    def calculate_due_payment(self):
+        if self.work_type:
+            return self.work_units * self.work_type.rate
+        return 0.0
+
+class SupplyType(db.Model):
+    __tablename__ = "supply_type"
+    __table_args__ = (
+        db.Index("ix_supply_type_parent_id", "parent_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    description = db.Column(db.String(200))
+
+    parent_id = db.Column(
+        db.Integer,
+        db.ForeignKey("supply_type.id", name="fk_supplytype_parent"),
+        nullable=True
+    )
+    parent = db.relationship("SupplyType", remote_side=[id], backref="children")
+
+    def __repr__(self):
+        return f"<SupplyType {self.name}>"
+
+class SupplyLog(db.Model):
+    __tablename__ = "supply_log"
+    __table_args__ = (
+        db.Index("ix_supply_log_supplier_date", "supplier_id", "date"),
+        db.Index("ix_supply_log_date", "date"),
+        db.Index("ix_supply_log_type_date", "supply_type_id", "date"),
+        db.Index("ix_supply_log_payment_id", "payment_id"),
+        # Unpaid deliveries per supplier
+        db.Index(
+            "ix_supply_log_unpaid",
+            "supplier_id", "date",
+            sqlite_where=text("payment_id IS NULL")
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+
+    supplier_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey("relationship.id"), nullable=False), active_history=True
+    )
+    supplier = db.relationship("Relationship", backref="supply_logs")
+
+    supply_type_id = db.Column(db.Integer, db.ForeignKey("supply_type.id"), nullable=False)
+    supply_type = db.relationship("SupplyType", backref="supply_logs")
+
+    unit_price = db.Column(db.Float, nullable=False)
+    units = db.Column(db.Float, nullable=False)
+    amount = db.column_property(db.Column(db.Float, nullable=False), active_history=True)
+    description = db.Column(db.Text, nullable=True)
+
+    # Many-to-one: each SupplyLog belongs to one SupplyPayment
+    payment_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey("supply_payment.id"), nullable=True), active_history=True
+    )
+    payment = db.relationship("SupplyPayment", back_populates="supply_logs")
+
+
+class SupplyPayment(db.Model):
+    __tablename__ = "supply_payment"
+    __table_args__ = (
+        db.Index("ix_supply_payment_transaction_id", "transaction_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey("transaction.id"), nullable=False)
+
+    transaction = db.relationship("Transaction", backref="supply_payment")
+
+    # One payment can cover multiple supply logs
+    supply_logs = db.relationship("SupplyLog", back_populates="payment")
+
+
+
+
+class Payroll(db.Model):
+    __tablename__ = "payroll"
+    __table_args__ = (
+        db.Index("ix_payroll_transaction_id", "transaction_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey("transaction.id"), nullable=False)
+
+    transaction = db.relationship("Transaction", backref="payroll")
+    worklogs = db.relationship("WorkLog", back_populates="payroll")
+
+
+# --- Daily ledger rollup ---
+class LedgerDaily(db.Model):
+    """Transaction totals per day, transaction type and relationship type.
+
+    Kept up to date by `update_ledger_daily` on every flush; rebuild it with
+    `flask rebuild-ledger` after bulk query.update()/delete() calls, which
+    bypass the session.
+    """
+    __tablename__ = "ledger_daily"
+
+    day = db.Column(db.Date, primary_key=True)
+    transaction_type_id = db.Column(db.Integer, db.ForeignKey("transaction_type.id"), primary_key=True)
+    relationship_type_id = db.Column(db.Integer, db.ForeignKey("relationship_type.id"), primary_key=True)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+    transaction_type = db.relationship("TransactionType")
+    relationship_type = db.relationship("RelationshipType")
+
+
+# --- Relationship balances ---
+class RelationshipBalance(db.Model):
+    """What we owe each relationship and have paid it, kept current on every flush.
+
+    Every work log and supply log counts towards exactly one bucket: unpaid
+    until it is linked to a payroll / supply payment, then paid_total.
+    last_activity is the latest work log end date, supply log date or
+    transaction date seen; deletes don't move it back until the next
+    `flask reconcile-balances`, which also repairs drift from bulk
+    query.update()/delete() calls that bypass the session.
+    """
+    __tablename__ = "relationship_balance"
+
+    relationship_id = db.Column(db.Integer, db.ForeignKey("relationship.id"), primary_key=True)
+    unpaid_worklog_total = db.Column(db.Float, nullable=False, default=0.0)
+    unpaid_worklog_count = db.Column(db.Integer, nullable=False, default=0)
+    unpaid_supply_total = db.Column(db.Float, nullable=False, default=0.0)
+    unpaid_supply_count = db.Column(db.Integer, nullable=False, default=0)
+    paid_total = db.Column(db.Float, nullable=False, default=0.0)
+    last_activity = db.Column(db.Date, nullable=True)
+
+    relationship = db.relationship("Relationship")
+
+    @property
+    def owed_total(self):
+        return self.unpaid_worklog_total + self.unpaid_supply_total
+
+
+# --- Supply type tree (closure table) ---
+class SupplyTypeClosure(db.Model):
+    """One row per (ancestor, descendant) pair in the SupplyType tree, self-pairs included.
+
+    Lets subtree queries join once instead of walking parent_id level by
+    level. Maintained by `update_supply_type_closure` whenever supply types
+    are added, re-parented or deleted; `flask rebuild-supply-tree` recomputes
+    it from parent_id.
+    """
+    __tablename__ = "supply_type_closure"
+    __table_args__ = (
+        db.Index("ix_supply_type_closure_descendant", "descendant_id", "ancestor_id"),
+    )
+
+    ancestor_id = db.Column(db.Integer, db.ForeignKey("supply_type.id"), primary_key=True)
+    descendant_id = db.Column(db.Integer, db.ForeignKey("supply_type.id"), primary_key=True)
+    depth = db.Column(db.Integer, nullable=False)
+
+
+# --- Table versions ---
+# One counter per table, bumped by each commit that writes to it; see app.core.versions
+class TableVersion(db.Model):
+    __tablename__ = "table_version"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False)
+
+
+# --- Background jobs ---
+# One row per job queued through app.jobs.submit_job
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    params = db.Column(db.Text, nullable=False, default="{}")
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+    message = db.Column(db.String(200), nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed")
+
+    @property
+    def result_data(self):
+        return json.loads(self.result) if self.result else None
+
+    def abandoned(self, cutoff):
+        """Still queued or running since before `cutoff`; see fail_stale_jobs."""
+        since = self.created_at if self.status == "queued" else self.started_at
+        return not self.finished and since is not None and since < cutoff
+
+    def report_progress(self, done, total=None, message=None):
+        """Record progress; it is saved with the handler's next commit."""
+        self.progress_done = done
+        if total is not None:
+            self.progress_total = total
+        if message is not None:
+            self.message = message[:200]
+        db.session.flush()
+
+
+#@event.listens_for(WorkLog, "before_insert")
+#@event.listens_for(WorkLog, "before_update")
+#def set_due_payment(mapper, connection, target):
+#    target.due_payment = target.calculate_due_payment()
+#    print("calculated due payement : ", target.due_payment)
@@ -0,0 +1,245 @@
+"""Cost reports.
+
+Monthly or weekly trends, each report one grouped SQL statement over the
+date-led indexes. SQL labels every row with its bucket (the month as
+"YYYY-MM", or the Monday starting the week); pivot_report then lays the
+rows out as one series per work type / supply type / counterparty over
+every bucket in the range, filling quiet buckets with zero.
+"""
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from flask import Blueprint, abort, jsonify, render_template, request
+from sqlalchemy import case, func
+
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.lists import date_arg, int_arg, relationship_label
+from app.models import Entity, Relationship, SupplyLog, SupplyType, Transaction, TransactionType, WorkLog, WorkType
+
+bp = Blueprint("reports", __name__)
+
+
+REPORT_PERIODS = {
+    "month": lambda col: func.strftime("%Y-%m", col),
+    "week": lambda col: func.date(col, "weekday 0", "-6 days"),
+}
+REPORTS = OrderedDict()
+
+
+def report(name, title, value, detail=None):
+    """Register `func(bucket, start_date, end_date, **args)` as report `name`.
+
+    The function returns rows with a "bucket", a "key" and "label" naming
+    the series, and metrics; `value` is the metric pivoted into the table
+    and `detail` an optional one shown under it in each cell.
+    """
+    def register(func):
+        REPORTS[name] = {"title": title, "compute": func, "value": value, "detail": detail}
+        return func
+    return register
+
+
+def report_buckets(period, start_date, end_date):
+    """Every bucket label between start_date and end_date, matching REPORT_PERIODS."""
+    buckets = []
+    if period == "month":
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            buckets.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    else:
+        day = start_date - timedelta(days=start_date.weekday())
+        while day <= end_date:
+            buckets.append(day.isoformat())
+            day += timedelta(days=7)
+    return buckets
+
+
+def report_range(period):
+    """start_date/end_date from the query string, defaulting to the last 12 months or weeks."""
+    end_date = date_arg("end_date") or date.today()
+    start_date = date_arg("start_date")
+    if start_date is None:
+        if period == "month":
+            months = end_date.year * 12 + end_date.month - 12
+            start_date = date(months // 12, months % 12 + 1, 1)
+        else:
+            start_date = end_date - timedelta(days=end_date.weekday() + 7 * 11)
+    if start_date > end_date:
+        abort(400, "start_date must not be after end_date")
+    return start_date, end_date
+
+
+def pivot_report(rows, buckets, value):
+    """One series per key with `value` per bucket (0 where missing), its total and change on the prior bucket."""
+    position = {bucket: i for i, bucket in enumerate(buckets)}
+    series = OrderedDict()
+    for row in rows:
+        entry = series.setdefault(row["key"], {
+            "key": row["key"],
+            "label": row["label"],
+            "values": [0.0] * len(buckets),
+            "cells": [None] * len(buckets),
+        })
+        entry["values"][position[row["bucket"]]] = row[value]
+        entry["cells"][position[row["bucket"]]] = row
+    for entry in series.values():
+        entry["total"] = sum(entry["values"])
+        entry["change"] = entry["values"][-1] - entry["values"][-2] if len(buckets) > 1 else None
+    return sorted(series.values(), key=lambda entry: -entry["total"])
+
+
+@report("payroll_by_work_type", "Payroll Cost by Work Type", "cost", detail="cost_per_unit")
+def payroll_by_work_type(bucket, start_date, end_date):
+    period = bucket(WorkLog.start_date).label("bucket")
+    query = (
+        db.select(
+            period,
+            WorkLog.work_type_id,
+            func.sum(WorkLog.due_payment),
+            func.sum(case((WorkLog.payroll_id.isnot(None), WorkLog.due_payment), else_=0.0)),
+            func.sum(WorkLog.work_units),
+            func.count(WorkLog.id),
+        )
+        .where(WorkLog.start_date.between(start_date, end_date))
+        .group_by(period, WorkLog.work_type_id)
+    )
+    rows = []
+    for bucket_label, work_type_id, cost, paid, units, logs in db.session.execute(query):
+        work_type = reference_data.get(WorkType, work_type_id)
+        rows.append({
+            "bucket": bucket_label,
+            "key": work_type_id,
+            "label": work_type.name if work_type else f"#{work_type_id}",
+            "cost": cost,
+            "paid": paid,
+            "units": units,
+            "logs": logs,
+            "cost_per_unit": cost / units if units else None,
+        })
+    return rows
+
+
+@report("supply_by_type", "Supply Spend by Type", "amount", detail="unit_price")
+def supply_by_type(bucket, start_date, end_date):
+    period = bucket(SupplyLog.date).label("bucket")
+    query = (
+        db.select(
+            period,
+            SupplyLog.supply_type_id,
+            func.sum(SupplyLog.amount),
+            func.sum(SupplyLog.units),
+            func.min(SupplyLog.unit_price),
+            func.max(SupplyLog.unit_price),
+            func.count(SupplyLog.id),
+        )
+        .where(SupplyLog.date.between(start_date, end_date))
+        .group_by(period, SupplyLog.supply_type_id)
+    )
+    rows = []
+    for bucket_label, supply_type_id, amount, units, low, high, logs in db.session.execute(query):
+        supply_type = reference_data.get(SupplyType, supply_type_id)
+        rows.append({
+            "bucket": bucket_label,
+            "key": supply_type_id,
+            "label": supply_type.name if supply_type else f"#{supply_type_id}",
+            "amount": amount,
+            "units": units,
+            "logs": logs,
+            "unit_price": amount / units if units else None,  # weighted by units
+            "min_unit_price": low,
+            "max_unit_price": high,
+        })
+    return rows
+
+
+@report("top_counterparties", "Top Counterparties", "amount", detail="rank")
+def top_counterparties(bucket, start_date, end_date, type_id=None, top=5):
+    """The `top` relationships by transaction amount in each bucket, optionally of one transaction type."""
+    period = bucket(Transaction.date)
+    totals = (
+        db.select(
+            period.label("bucket"),
+            Transaction.relationship_id,
+            func.sum(Transaction.amount).label("amount"),
+            func.count(Transaction.id).label("transactions"),
+        )
+        .where(Transaction.date.between(start_date, end_date))
+        .group_by(period, Transaction.relationship_id)
+    )
+    if type_id:
+        totals = totals.where(Transaction.transaction_type_id == type_id)
+    totals = totals.subquery()
+    ranked = db.select(
+        totals,
+        func.rank().over(partition_by=totals.c.bucket, order_by=totals.c.amount.desc()).label("rank")
+    ).subquery()
+    query = (
+        db.select(ranked, Entity.name, Relationship.relationship_type_id)
+        .join(Relationship, Relationship.id == ranked.c.relationship_id)
+        .join(Entity, Entity.id == Relationship.entity_id)
+        .where(ranked.c.rank <= top)
+        .order_by(ranked.c.bucket, ranked.c.rank)
+    )
+    rows = []
+    for row in db.session.execute(query):
+        rows.append({
+            "bucket": row.bucket,
+            "key": row.relationship_id,
+            "label": relationship_label(row.name, row.relationship_type_id),
+            "amount": row.amount,
+            "transactions": row.transactions,
+            "rank": row.rank,
+        })
+    return rows
+
+
+def run_report(name):
+    """Compute report `name` for the period, range and filters in the query string."""
+    if name not in REPORTS:
+        abort(404)
+    period = request.args.get("period", "month")
+    if period not in REPORT_PERIODS:
+        abort(400, f"period must be one of {', '.join(REPORT_PERIODS)}")
+    start_date, end_date = report_range(period)
+    args = {}
+    if name == "top_counterparties":
+        args = {"type_id": int_arg("type_id"), "top": int_arg("top") or 5}
+    spec = REPORTS[name]
+    rows = spec["compute"](REPORT_PERIODS[period], start_date, end_date, **args)
+    buckets = report_buckets(period, start_date, end_date)
+    return {
+        "report": name,
+        "title": spec["title"],
+        "period": period,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "value": spec["value"],
+        "detail": spec["detail"],
+        "buckets": buckets,
+        "series": pivot_report(rows, buckets, spec["value"]),
+        "items": rows,
+    }
+
+
+@bp.route("/reports")
+@bp.route("/reports/<name>")
+def reports(name="payroll_by_work_type"):
+    result = run_report(name)
+    return render_template(
+        "reports.html",
+        title="Reports",
+        reports=REPORTS,
+        result=result,
+        transaction_types=reference_data.all(TransactionType) if name == "top_counterparties" else None
+    )
+
+
+@bp.route("/api/reports/<name>")
+@bp.route("/api/v1/reports/<name>")
+def api_report(name):
+    result = run_report(name)
+    for entry in result["series"]:
+        del entry["cells"]  # the same rows as "items", laid out per bucket for the template
+    return jsonify(result)
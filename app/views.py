@@ -0,0 +1,820 @@
+"""The HTML pages, and the job handlers behind their slow actions."""
+from datetime import date, datetime
+
+from flask import Blueprint, Response, abort, jsonify, redirect, render_template, request, url_for
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
+
+from app.core.caches import dashboard_cache, reference_data, work_type_rates
+from app.core.cascade import cascade_counts, cascade_delete, cascade_plan
+from app.core.database import db
+from app.core.lists import (
+    date_arg, entity_page, int_arg, relationship_page, selected_relationship, supply_log_page, transaction_page,
+    worklog_page,
+)
+from app.core.metrics import request_metrics
+from app.core.payments import (
+    SupplyPaymentError, payable_supply_log_count, run_payroll, run_supply_payments, unpaid_supply_totals,
+    unpaid_worklog_totals,
+)
+from app.core.rollups import (
+    amounts_owed, is_supply_type_descendant, optional_id, supply_type_totals, supply_type_tree_rows,
+)
+from app.core.versions import conditional_get, table_versions
+from app.jobs import JobError, job_accepted, job_handler, submit_job
+from app.models import (
+    Entity, Job, LedgerDaily, Payroll, Relationship, RelationshipType, SupplyLog, SupplyPayment, SupplyType,
+    Transaction, TransactionType, WorkLog, WorkType,
+)
+
+bp = Blueprint("main", __name__)
+
+
+@bp.route("/")
+def home():
+    return render_template("index.html", title="Home")
+
+@bp.route("/entities")
+@conditional_get(Entity, Relationship, RelationshipType)
+def entities():
+    all_entities, next_cursor = entity_page()
+    types = reference_data.all(RelationshipType)
+    return render_template(
+        "entities.html",
+        title="Entities",
+        entities=all_entities,
+        types=types,
+        next_cursor=next_cursor
+    )
+
+@bp.route("/add_entity", methods=["POST"])
+def add_entity():
+    name = request.form['name']
+    email = request.form['email']
+    phone = request.form['phone']
+    address = request.form.get('address')  # New field
+    new_entity = Entity(name=name, email=email, phone=phone, address=address)
+    db.session.add(new_entity)
+    db.session.commit()
+    return redirect(url_for('.entities'))
+
+ENTITY_INFO_RECENT_ROWS = 20
+
+
+def recent_rows_by_relationship(model, relationship_col, date_col, relationship_ids, *options):
+    """Latest ENTITY_INFO_RECENT_ROWS rows of `model` per relationship, in one query."""
+    if not relationship_ids:
+        return {}
+    row_number = func.row_number().over(
+        partition_by=relationship_col,
+        order_by=(date_col.desc(), model.id.desc())
+    ).label("row_number")
+    ranked = (
+        db.session.query(model.id.label("id"), row_number)
+        .filter(relationship_col.in_(relationship_ids))
+        .subquery()
+    )
+    rows = (
+        model.query
+        .options(*options)
+        .join(ranked, model.id == ranked.c.id)
+        .filter(ranked.c.row_number <= ENTITY_INFO_RECENT_ROWS)
+        .order_by(date_col.desc(), model.id.desc())
+        .all()
+    )
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(getattr(row, relationship_col.key), []).append(row)
+    return grouped
+
+
+@bp.route("/entity_info/<int:entity_id>")
+def entity_info(entity_id):
+    entity = Entity.query.get_or_404(entity_id)
+
+    # Get all relationships for this entity, with their type
+    relationships = (
+        Relationship.query
+        .options(joinedload(Relationship.relationship_type))
+        .filter_by(entity_id=entity_id)
+        .order_by(Relationship.id)
+        .all()
+    )
+    rel_ids = [rel.id for rel in relationships]
+
+    # Per-relationship totals, computed in SQL
+    txn_totals = {
+        rel_id: (count, total)
+        for rel_id, count, total in db.session.query(
+            Transaction.relationship_id,
+            func.count(Transaction.id),
+            func.coalesce(func.sum(Transaction.amount), 0.0)
+        )
+        .filter(Transaction.relationship_id.in_(rel_ids))
+        .group_by(Transaction.relationship_id)
+    }
+    worklog_totals = {
+        rel_id: (count, unpaid)
+        for rel_id, count, unpaid in db.session.query(
+            WorkLog.relationship_id,
+            func.count(WorkLog.id),
+            func.coalesce(func.sum(case((WorkLog.payroll_id.is_(None), WorkLog.due_payment), else_=0.0)), 0.0)
+        )
+        .filter(WorkLog.relationship_id.in_(rel_ids))
+        .group_by(WorkLog.relationship_id)
+    }
+    supply_totals = {
+        rel_id: (count, unpaid)
+        for rel_id, count, unpaid in db.session.query(
+            SupplyLog.supplier_id,
+            func.count(SupplyLog.id),
+            func.coalesce(func.sum(case((SupplyLog.payment_id.is_(None), SupplyLog.amount), else_=0.0)), 0.0)
+        )
+        .filter(SupplyLog.supplier_id.in_(rel_ids))
+        .group_by(SupplyLog.supplier_id)
+    }
+
+    # Most recent detail rows; the full history is on the paginated list views
+    recent_transactions = recent_rows_by_relationship(
+        Transaction, Transaction.relationship_id, Transaction.date, rel_ids,
+        joinedload(Transaction.transaction_type)
+    )
+    recent_worklogs = recent_rows_by_relationship(
+        WorkLog, WorkLog.relationship_id, WorkLog.start_date, rel_ids
+    )
+    recent_supply_logs = recent_rows_by_relationship(
+        SupplyLog, SupplyLog.supplier_id, SupplyLog.date, rel_ids,
+        joinedload(SupplyLog.supply_type)
+    )
+
+    # Organize by relationship type
+    data = []
+    for rel in relationships:
+        transaction_count, total_amount = txn_totals.get(rel.id, (0, 0.0))
+        worklog_count, unpaid_worklogs = worklog_totals.get(rel.id, (0, 0.0))
+        supply_log_count, unpaid_supply_logs = supply_totals.get(rel.id, (0, 0.0))
+        data.append({
+            "relationship": rel,
+            "relationship_type": rel.relationship_type,
+            "transactions": recent_transactions.get(rel.id, []),
+            "transaction_count": transaction_count,
+            "total_amount": total_amount,
+            "worklogs": recent_worklogs.get(rel.id, []),
+            "worklog_count": worklog_count,
+            "unpaid_worklogs": unpaid_worklogs,
+            "supply_logs": recent_supply_logs.get(rel.id, []),
+            "supply_log_count": supply_log_count,
+            "unpaid_supply_logs": unpaid_supply_logs,
+        })
+
+    return render_template(
+        "entity_info.html",
+        entity=entity,
+        data=data,
+        title=f"Entity Info - {entity.name}"
+    )
+
+
+@bp.route("/delete_entity/<int:entity_id>", methods=["POST"])
+def delete_entity(entity_id):
+    entity = Entity.query.get_or_404(entity_id)
+    # Count everything a force delete would take with it
+    counts = cascade_counts(cascade_plan(Entity, [entity_id]))
+    if counts:
+        return jsonify({"status": "warning", "count": counts.get("relationship", 0), "rows": counts})
+    
+    # No relationships, safe to delete
+    db.session.delete(entity)
+    db.session.commit()
+    return jsonify({"status": "deleted"})
+
+@bp.route("/force_delete_entity/<int:entity_id>", methods=["POST"])
+def force_delete_entity(entity_id):
+    Entity.query.get_or_404(entity_id)
+    return job_accepted(submit_job("force_delete_entity", entity_id=entity_id))
+
+
+@job_handler("force_delete_entity")
+def force_delete_entity_job(job, entity_id):
+    if db.session.get(Entity, entity_id) is None:
+        raise JobError(f"Entity {entity_id} no longer exists")
+    return cascade_delete(Entity, [entity_id], progress=job.report_progress)
+
+@bp.route("/transaction_types")
+def transaction_types():
+    all_types = TransactionType.query.all()
+    return render_template(
+        "transaction_types.html", 
+        title="Transaction Types", 
+        types=all_types
+    )
+
+@bp.route("/add_transaction_type", methods=["POST"])
+def add_transaction_type():
+    name = request.form['name']
+    description = request.form.get('description')
+    new_type = TransactionType(name=name, description=description)
+    db.session.add(new_type)
+    db.session.commit()
+    return redirect(url_for('.transaction_types'))
+
+
+@bp.route("/transactions")
+@conditional_get(Transaction, TransactionType, Relationship, Entity, RelationshipType, key=date.today)
+def transactions():
+    all_transactions, next_cursor = transaction_page()
+    transaction_types = reference_data.all(TransactionType)
+    return render_template(
+        "transactions.html",
+        title="Transactions",
+        transactions=all_transactions,
+        transaction_types=transaction_types,
+        selected_relationship=selected_relationship(),
+        next_cursor=next_cursor,
+        datetime=datetime
+    )
+
+#@bp.route("/add_transaction", methods=["POST"])
+#def add_transaction():
+#    transaction_type_id = request.form['transaction_type_id']
+#    relationship_id = request.form['relationship_id']
+#    amount = float(request.form['amount'])
+#    date = request.form['date']
+#    description = request.form.get('description')
+#
+#    new_transaction = Transaction(
+#        transaction_type_id=transaction_type_id,
+#        relationship_id=relationship_id,
+#        amount=amount,
+#        date=date,
+#        description=description
+#    )
+#    db.session.add(new_transaction)
+#    db.session.commit()
+#    return redirect(url_for('.transactions'))
+
+@bp.route("/add_transaction", methods=["POST"])
+def add_transaction():
+    transaction_type_id = int(request.form['transaction_type_id'])
+    relationship_id = int(request.form['relationship_id'])
+    description = request.form.get('description', "")
+    date = datetime.utcnow()
+
+    transaction_type = reference_data.get(TransactionType, transaction_type_id)
+    if not transaction_type:
+        abort(400, "Unknown transaction type")
+
+    # --- Payroll case ---
+    if transaction_type.name == "Payroll":
+        selected_ids = request.form.getlist("worklogs")  # list of IDs
+        selected_logs = WorkLog.query.filter(WorkLog.id.in_(selected_ids)).all()
+        amount = sum(log.due_payment for log in selected_logs)
+
+        transaction = Transaction(
+            transaction_type_id=transaction_type.id,
+            relationship_id=relationship_id,
+            amount=amount,
+            date=date,
+            description=description
+        )
+        db.session.add(transaction)
+        db.session.flush()  # so transaction.id is available
+
+        # create payroll entry linked to this transaction
+        payroll_entry = Payroll(transaction_id=transaction.id)
+        db.session.add(payroll_entry)
+        db.session.flush()  # so payroll_entry.id is available
+
+        for log in selected_logs:
+            log.payroll_id = payroll_entry.id
+
+    # --- Supply payment case: settle the ticked supply logs ---
+    elif transaction_type.name == "Supply Payments" and request.form.getlist("supply_logs"):
+        log_ids = sorted({int(i) for i in request.form.getlist("supply_logs")})
+        if payable_supply_log_count(relationship_id, log_ids) != len(log_ids):
+            abort(409, "Some supply logs are already paid or belong to another supplier")
+        try:
+            results = run_supply_payments(supplier_ids=[relationship_id], log_ids=log_ids, description=description)
+        except SupplyPaymentError as exc:
+            abort(409, str(exc))
+        if not results:
+            abort(409, "The supply logs were paid by another run")
+        return redirect(url_for('.transactions'))
+
+    # --- Other transaction types ---
+    else:
+        amount = float(request.form['amount'])
+        transaction = Transaction(
+            transaction_type_id=transaction_type.id,
+            relationship_id=relationship_id,
+            amount=amount,
+            date=date,
+            description=description
+        )
+        db.session.add(transaction)
+
+    db.session.commit()
+    return redirect(url_for('.transactions'))
+
+
+
+
+
+@bp.route("/relationship_types")
+def relationship_types():
+    all_types = RelationshipType.query.all()
+    return render_template("relationship_types.html", title="Relationship Types", types=all_types)
+
+@bp.route("/add_relationship_type", methods=["POST"])
+def add_relationship_type():
+    name = request.form['name']
+    description = request.form.get('description')
+    new_type = RelationshipType(name=name, description=description)
+    db.session.add(new_type)
+    db.session.commit()
+    return redirect(url_for('.relationship_types'))
+
+@bp.route("/relationships")
+def relationships():
+    all_relationships, next_cursor = relationship_page()
+    types = reference_data.all(RelationshipType)
+    entity_id = int_arg("entity_id")
+    selected = db.session.get(Entity, entity_id) if entity_id else None
+    return render_template(
+        "relationships.html", 
+        title="Relationships", 
+        relationships=all_relationships,
+        selected_entity={"id": selected.id, "label": selected.name} if selected else None,
+        types=types,
+        next_cursor=next_cursor
+    )
+
+
+@bp.route("/add_relationship", methods=["POST"])
+def add_relationship():
+    entity_id = request.form['entity_id']
+    relationship_type_id = request.form['relationship_type_id']
+
+    new_rel = Relationship(
+        entity_id=entity_id,
+        relationship_type_id=relationship_type_id
+    )
+    db.session.add(new_rel)
+    db.session.commit()
+    return redirect(url_for('.relationships'))
+
+@bp.route("/delete_relationship_type/<int:type_id>", methods=["POST"])
+def delete_relationship_type(type_id):
+    r_type = RelationshipType.query.get_or_404(type_id)
+    # Count everything a force delete would take with it
+    counts = cascade_counts(cascade_plan(RelationshipType, [type_id]))
+    if counts:
+        return jsonify({"status": "warning", "count": counts.get("relationship", 0), "rows": counts})
+    
+    # No relationships, safe to delete
+    db.session.delete(r_type)
+    db.session.commit()
+    return jsonify({"status": "deleted"})
+
+@bp.route("/force_delete_relationship_type/<int:type_id>", methods=["POST"])
+def force_delete_relationship_type(type_id):
+    RelationshipType.query.get_or_404(type_id)
+    return job_accepted(submit_job("force_delete_relationship_type", type_id=type_id))
+
+
+@job_handler("force_delete_relationship_type")
+def force_delete_relationship_type_job(job, type_id):
+    if db.session.get(RelationshipType, type_id) is None:
+        raise JobError(f"Relationship type {type_id} no longer exists")
+    return cascade_delete(RelationshipType, [type_id], progress=job.report_progress)
+
+#@bp.route("/dashboard")
+#def dashboard():
+#    # Get count of entities per relationship type
+#    summary = db.session.query(
+#        RelationshipType.id,
+#        RelationshipType.name,
+#        func.count(Relationship.id)
+#    ).outerjoin(Relationship).group_by(RelationshipType.id).all()
+#
+#    # Pass (name, count, id) to template
+#    summary_list = [(name, count, type_id) for type_id, name, count in summary]
+#    return render_template("dashboard.html", title="Dashboard", summary=summary_list)
+
+
+# --- Dashboard ---
+def transaction_summary_for(start_date, end_date):
+    return [
+        (name, total) for name, total in
+        db.session.query(
+            TransactionType.name,
+            db.func.sum(LedgerDaily.total_amount)
+        )
+        .join(TransactionType, LedgerDaily.transaction_type_id == TransactionType.id)
+        .filter(LedgerDaily.day >= start_date, LedgerDaily.day <= end_date)
+        .group_by(TransactionType.name)
+        .having(db.func.sum(LedgerDaily.transaction_count) > 0)
+        .all()
+    ]
+
+
+def relationship_summary():
+    rel_summary = (
+        db.session.query(
+            RelationshipType.id,
+            RelationshipType.name,
+            db.func.count(Relationship.id)
+        )
+        .outerjoin(Relationship, Relationship.relationship_type_id == RelationshipType.id)
+        .group_by(RelationshipType.id, RelationshipType.name)
+        .all()
+    )
+    # Convert to dicts for clarity
+    return [{"id": r[0], "name": r[1], "count": r[2]} for r in rel_summary]
+
+
+@bp.route("/dashboard", methods=["GET", "POST"])
+@conditional_get(LedgerDaily, TransactionType, Relationship, RelationshipType, key=date.today)
+def dashboard():
+    # defaults
+    start_date = end_date = date.today()
+
+    if request.method == "POST":
+        start_date = request.form.get("start_date")
+        end_date = request.form.get("end_date")
+
+        # convert from string
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+
+    # --- Transaction Summary ---
+    # Keyed by table versions too, so a write in another worker process is
+    # never served from this one's cache under the new ETag
+    transaction_summary = dashboard_cache.get_or_compute(
+        ("transactions", start_date, end_date, *table_versions(["ledger_daily", "transaction_type"])),
+        lambda: transaction_summary_for(start_date, end_date)
+    )
+
+    # --- Relationship Summary ---
+    summary_data = dashboard_cache.get_or_compute(
+        ("relationships", *table_versions(["relationship", "relationship_type"])), relationship_summary
+    )
+
+    return render_template(
+        "dashboard.html",
+        title="Dashboard",
+        summary=summary_data,
+        transaction_summary=transaction_summary,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@bp.route("/amounts_owed")
+def amounts_owed_view():
+    rows = amounts_owed(int_arg("type_id"))
+    return render_template(
+        "amounts_owed.html",
+        rows=rows,
+        total=sum(row["owed_total"] for row in rows),
+        types=reference_data.all(RelationshipType),
+        title="Amounts Owed"
+    )
+
+
+@bp.route("/entities_by_relationship/<int:type_id>")
+def entities_by_relationship(type_id):
+    r_type = RelationshipType.query.get_or_404(type_id)
+    entities = Entity.query.join(Relationship).filter(Relationship.relationship_type_id == type_id).all()
+    return render_template(
+        "entities_by_relationship.html",
+        title=f"Entities - {r_type.name}",
+        relationship_type=r_type,
+        entities=entities
+    )
+
+@bp.route("/worktypes", methods=["GET", "POST"])
+def worktypes():
+    if request.method == "POST":
+        name = request.form["name"]
+        description = request.form["description"]
+        pay_type = request.form["pay_type"]
+        rate = float(request.form["rate"])
+        wt = WorkType(name=name, description=description, pay_type=pay_type, rate=rate)
+        db.session.add(wt)
+        db.session.commit()
+        return redirect(url_for(".worktypes"))
+    worktypes = WorkType.query.all()
+    return render_template("worktypes.html", title="Work Types", worktypes=worktypes)
+
+
+
+@bp.route("/worktypes/delete/<int:wt_id>", methods=["POST"])
+def delete_worktype(wt_id):
+    wt = WorkType.query.get_or_404(wt_id)
+    db.session.delete(wt)
+    db.session.commit()
+    return redirect(url_for(".worktypes"))
+
+
+@bp.route('/worklogs', methods=['GET', 'POST'])
+@conditional_get(WorkLog, WorkType, Relationship, Entity, RelationshipType, key=date.today)
+def worklogs():
+    if request.method == 'POST':
+        work_type_id = request.form.get('work_type_id', type=int)
+        work_units = float(request.form['work_units'])
+
+        # Convert input strings to Python date objects
+        start_date = datetime.strptime(request.form['start_date'], "%Y-%m-%d").date()
+        end_date = datetime.strptime(request.form['end_date'], "%Y-%m-%d").date()
+
+        rate = work_type_rates([work_type_id]).get(work_type_id)
+        if rate is None:
+            abort(400, "Unknown work type")
+        relationship_id = int(request.form['relationship_id'])
+
+        # Calculate due payment
+        due_payment = rate * work_units
+
+        description = request.form.get("description", "")
+
+        paid = request.form.get("paid") == "1"
+
+        new_log = WorkLog(
+            start_date=start_date,
+            end_date=end_date,
+            work_type_id=work_type_id,
+            relationship_id=relationship_id,
+            work_units=work_units,
+            due_payment=due_payment,
+            description=description
+        )
+        db.session.add(new_log)
+        db.session.flush()
+
+        if paid:
+            txn_type = reference_data.by_name(TransactionType, "Payroll")
+            if not txn_type:
+                abort(400, "Payroll transaction type not found")
+
+            transaction = Transaction(
+                transaction_type_id=txn_type.id,
+                relationship_id=relationship_id,
+                amount=due_payment,
+                date=datetime.utcnow(),
+                description=f"Auto payroll for WorkLog #{new_log.id}"
+            )
+            db.session.add(transaction)
+            db.session.flush()
+
+            # Create payroll entry linked to this transaction
+            payroll_entry = Payroll(transaction_id=transaction.id)
+            db.session.add(payroll_entry)
+            db.session.flush()
+            new_log.payroll = payroll_entry   # sets payroll_id in WorkLog
+
+        db.session.commit()
+        return redirect(url_for('.worklogs'))
+
+    work_types = reference_data.all(WorkType)
+    current_date = datetime.today().strftime("%Y-%m-%d")
+    selected_employee = selected_relationship(with_type=False)
+    logs, next_cursor = worklog_page()
+    return render_template('worklogs.html', work_types=work_types, selected_employee=selected_employee, logs=logs, current_date=current_date, next_cursor=next_cursor)
+
+
+# --- Payroll and supply payment runs ---
+def payment_run_page(page):
+    """The preview/pay page shared by /payroll_run and /supply_payment_run.
+
+    GET previews the unpaid totals for the date range; POST queues a
+    `page["job"]` job for the ticked counterparties and redirects back with
+    ?job=<id>, where the page follows its progress and shows the results.
+    """
+    args = request.form if request.method == "POST" else request.args
+    today = date.today()
+    try:
+        start_date = datetime.strptime(args.get("start_date") or today.replace(day=1).isoformat(), "%Y-%m-%d").date()
+        end_date = datetime.strptime(args.get("end_date") or today.isoformat(), "%Y-%m-%d").date()
+    except ValueError:
+        abort(400, "Dates must be YYYY-MM-DD")
+
+    results = error = job = None
+    if request.method == "POST":
+        ids = [int(i) for i in request.form.getlist(page["ids_field"])]
+        if not ids:
+            error = f"Select at least one {page['counterparty'].lower()} to pay."
+        else:
+            job_id = submit_job(page["job"], start_date=start_date, end_date=end_date, **{page["ids_field"]: ids})
+            return redirect(url_for(request.endpoint, start_date=start_date, end_date=end_date, job=job_id))
+    elif int_arg("job"):
+        job = db.get_or_404(Job, int_arg("job"))
+        results, error = job.result_data, job.error
+
+    preview = page["totals"](start_date, end_date)
+    return render_template(
+        "payment_run.html",
+        title=page["title"],
+        page=page,
+        start_date=start_date,
+        end_date=end_date,
+        preview=preview,
+        results=results,
+        error=error,
+        job=job
+    )
+
+
+PAYROLL_RUN_PAGE = {
+    "title": "Payroll Run",
+    "job": "payroll_run",
+    "totals": unpaid_worklog_totals,
+    "ids_field": "relationship_ids",
+    "counterparty": "Employee",
+    "counterparties": "employees",
+    "logs": "Work Logs",
+    "name_key": "employee",
+    "count_key": "worklogs",
+    "from_label": "Work Started From",
+    "show_label": "Show Unpaid Work",
+    "submit_label": "Run Payroll",
+    "empty": "No unpaid work logs start in this period.",
+}
+
+
+@bp.route("/payroll_run", methods=["GET", "POST"])
+def payroll_run():
+    return payment_run_page(PAYROLL_RUN_PAGE)
+
+
+@job_handler("payroll_run")
+def payroll_run_job(job, start_date, end_date, relationship_ids):
+    return run_payroll(date.fromisoformat(start_date), date.fromisoformat(end_date), relationship_ids)
+
+
+SUPPLY_PAYMENT_RUN_PAGE = {
+    "title": "Supply Payment Run",
+    "job": "supply_payment_run",
+    "totals": unpaid_supply_totals,
+    "ids_field": "supplier_ids",
+    "counterparty": "Supplier",
+    "counterparties": "suppliers",
+    "logs": "Supply Logs",
+    "name_key": "supplier",
+    "count_key": "supply_logs",
+    "from_label": "Supplied From",
+    "show_label": "Show Unpaid Supplies",
+    "submit_label": "Pay Suppliers",
+    "empty": "No unpaid supply logs are dated in this period.",
+}
+
+
+@bp.route("/supply_payment_run", methods=["GET", "POST"])
+def supply_payment_run():
+    return payment_run_page(SUPPLY_PAYMENT_RUN_PAGE)
+
+
+@job_handler("supply_payment_run")
+def supply_payment_run_job(job, start_date, end_date, supplier_ids):
+    return run_supply_payments(date.fromisoformat(start_date), date.fromisoformat(end_date), supplier_ids)
+
+
+@bp.route("/supply_types", methods=["GET", "POST"])
+def supply_types():
+    if request.method == "POST":
+        name = request.form["name"]
+        description = request.form["description"]
+        parent_id = request.form.get("parent_id")
+
+        existing = SupplyType.query.filter_by(name=name).first()
+        if existing:
+            supply_types = SupplyType.query.all()
+            return render_template(
+                "supply_types.html",
+                supply_types=supply_types,
+                error="Supply Type with this name already exists!"
+            )
+        else:
+            supply_type = SupplyType(
+                name=name,
+                description=description,
+                parent_id=parent_id if parent_id else None
+            )
+            db.session.add(supply_type)
+            db.session.commit()
+            return redirect(url_for(".supply_types"))
+
+    supply_types = SupplyType.query.options(joinedload(SupplyType.parent)).all()
+    return render_template("supply_types.html", supply_types=supply_types)
+
+@bp.route("/supply_types/<int:st_id>/parent", methods=["POST"])
+def reparent_supply_type(st_id):
+    supply_type = SupplyType.query.get_or_404(st_id)
+    parent_id = optional_id(request.form.get("parent_id"))
+    if parent_id is not None:
+        SupplyType.query.get_or_404(parent_id)
+        if is_supply_type_descendant(parent_id, st_id):
+            abort(400, "A supply type cannot be moved under itself or one of its subtypes")
+    supply_type.parent_id = parent_id
+    db.session.commit()
+    return redirect(url_for(".supply_types"))
+
+
+@bp.route("/supply_types/report")
+def supply_type_report():
+    start_date, end_date = date_arg("start_date"), date_arg("end_date")
+    rows = supply_type_tree_rows(supply_type_totals(start_date, end_date))
+    return render_template(
+        "supply_type_report.html",
+        title="Supply Spend by Type",
+        rows=rows,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+
+@bp.route("/supply_logs")
+@conditional_get(SupplyLog, SupplyType, SupplyPayment, Relationship, Entity, RelationshipType)
+def supply_logs():
+    logs, next_cursor = supply_log_page()
+    supply_types = reference_data.all(SupplyType)
+    return render_template(
+        "supply_logs.html",
+        logs=logs,
+        supply_types=supply_types,
+        selected_supplier=selected_relationship(with_type=False),
+        next_cursor=next_cursor,
+        title="Supply Logs"
+    )
+
+@bp.route("/supply_logs/add", methods=["GET", "POST"])
+def add_supply_log():
+    if request.method == "POST":
+        date = request.form["date"]
+        supplier_id = request.form["supplier_id"]
+        supply_type_id = request.form["supply_type"]
+        unit_price = float(request.form["unit_price"])
+        units = float(request.form["units"])
+        amount = unit_price * units
+        description = request.form.get("description")
+        is_paid = "is_paid" in request.form  # checkbox
+
+        log = SupplyLog(
+            date=datetime.strptime(date, "%Y-%m-%d"),
+            supplier_id=supplier_id,
+            supply_type_id=supply_type_id,
+            unit_price=unit_price,
+            units=units,
+            amount=amount,
+            description=description
+        )
+
+        if is_paid:
+            # 1. Find transaction type "Supply Payments"
+            tx_type = reference_data.by_name(TransactionType, "Supply Payments")
+            if not tx_type:
+                abort(400, "Supply Payments transaction type not found")
+
+            # 2. Create Transaction
+            transaction = Transaction(
+                date=datetime.strptime(date, "%Y-%m-%d"),
+                transaction_type_id=tx_type.id,
+                relationship_id=supplier_id,
+                amount=amount,
+                description=f"Supply payment for {units} units @ {unit_price} (Supplier {supplier_id})"
+            )
+
+            # 3. Create SupplyPayment
+            supply_payment = SupplyPayment(transaction=transaction)
+
+            # 4. Link SupplyLog to SupplyPayment
+            log.payment = supply_payment
+
+            db.session.add(transaction)
+            db.session.add(supply_payment)
+
+        db.session.add(log)
+        db.session.commit()
+        return redirect(url_for(".supply_logs"))
+
+    supply_types = reference_data.all(SupplyType)
+    return render_template(
+        "add_supply_log.html",
+        supply_types=supply_types,
+        title="Add Supply Log"
+    )
+
+
+# --- Metrics ---
+@bp.route("/metrics")
+def metrics():
+    cache = dashboard_cache.stats()
+    body = request_metrics.render() + "\n".join([
+        "# HELP app_dashboard_cache_hits_total Dashboard summary cache hits.",
+        "# TYPE app_dashboard_cache_hits_total counter",
+        f"app_dashboard_cache_hits_total {cache['hits']}",
+        "# HELP app_dashboard_cache_misses_total Dashboard summary cache misses.",
+        "# TYPE app_dashboard_cache_misses_total counter",
+        f"app_dashboard_cache_misses_total {cache['misses']}",
+    ]) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
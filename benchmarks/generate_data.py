@@ -0,0 +1,193 @@
+"""Fill a scratch SQLite database with synthetic business data.
+
+    python benchmarks/generate_data.py /tmp/bench.db --entities 50000 \
+        --transactions 1000000 --worklogs 500000 --supply-logs 200000
+
+Entities get one relationship each (mostly employees and suppliers, some
+customers). Transactions, work logs and supply logs are spread evenly over
+--years of history ending today. Work logs and supply logs older than a
+month are marked paid against a payroll or supply payment of the same
+counterparty, so the unpaid ones are the recent tail, as in real use.
+Supply types form a tree --supply-type-depth levels deep with
+--supply-type-fanout children per node.
+
+The ledger rollup, supply type closure and relationship balances are
+rebuilt at the end, so the database is ready for benchmarks/routes.py.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.core.database import db  # noqa: E402
+from app.core.rollups import (  # noqa: E402
+    rebuild_ledger_daily, rebuild_relationship_balances, rebuild_supply_type_closure,
+)
+from app.core.seed import seed_defaults  # noqa: E402
+from app.models import (  # noqa: E402
+    Entity, Payroll, Relationship, RelationshipType, SupplyLog, SupplyPayment, SupplyType, Transaction,
+    TransactionType, WorkLog, WorkType,
+)
+
+BATCH_ROWS = 10000
+
+
+def batched_insert(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            conn.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="SQLite file to create (overwritten)")
+    parser.add_argument("--entities", type=int, default=50000)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--worklogs", type=int, default=500000)
+    parser.add_argument("--supply-logs", type=int, default=200000)
+    parser.add_argument("--supply-type-depth", type=int, default=6)
+    parser.add_argument("--supply-type-fanout", type=int, default=3)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        os.remove(args.path)
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.abspath(args.path)})
+
+    rng = random.Random(args.seed)
+    today = date.today()
+    days = args.years * 365
+    paid_before = today - timedelta(days=30)
+
+    def some_day():
+        return today - timedelta(days=rng.randrange(days))
+
+    started = time.monotonic()
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+        db.session.execute(
+            sqlite_insert(TransactionType.__table__)
+            .values(name="Sales", description="Payments received from customers")
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        db.session.commit()
+
+        rel_types = {t.name: t.id for t in RelationshipType.query}
+        txn_types = {t.name: t.id for t in TransactionType.query}
+        work_types = [(t.id, t.rate) for t in WorkType.query]
+
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+
+            # Entities and one relationship each
+            batched_insert(conn, Entity.__table__, (
+                {"id": i, "name": f"Entity {i}", "email": f"entity{i}@example.com",
+                 "phone": f"07{i:08d}", "address": f"{i} Estate Road"}
+                for i in range(1, args.entities + 1)
+            ))
+            kinds = []
+            for i in range(1, args.entities + 1):
+                roll = rng.random()
+                kinds.append("Employee" if roll < 0.6 else "Supplier" if roll < 0.9 else "Customer")
+            batched_insert(conn, Relationship.__table__, (
+                {"id": i, "entity_id": i, "relationship_type_id": rel_types[kind]}
+                for i, kind in enumerate(kinds, start=1)
+            ))
+            by_kind = {kind: [i for i, k in enumerate(kinds, start=1) if k == kind] for kind in rel_types}
+            by_kind = {k: v or [1] for k, v in by_kind.items()}
+
+            # Supply type tree, breadth first
+            supply_types, level, next_id = [], [None], 1
+            for depth in range(args.supply_type_depth):
+                next_level = []
+                for parent in level:
+                    for n in range(args.supply_type_fanout if parent or depth else 1):
+                        supply_types.append({"id": next_id, "name": f"Supply {next_id}", "parent_id": parent})
+                        next_level.append(next_id)
+                        next_id += 1
+                level = next_level
+            batched_insert(conn, SupplyType.__table__, supply_types)
+            leaves = level
+
+            # Transactions; payroll and supply payment ones get their Payroll / SupplyPayment
+            payrolls, supply_payments = {}, {}
+            txn_rows, payroll_rows, payment_rows = [], [], []
+            for txn_id in range(1, args.transactions + 1):
+                kind = rng.choice(("Employee", "Employee", "Supplier", "Customer"))
+                rel_id = rng.choice(by_kind[kind])
+                type_name = {"Employee": "Payroll", "Supplier": "Supply Payments", "Customer": "Sales"}[kind]
+                txn_rows.append({
+                    "id": txn_id, "transaction_type_id": txn_types[type_name], "relationship_id": rel_id,
+                    "amount": round(rng.uniform(500, 50000), 2), "date": some_day(), "description": type_name,
+                })
+                if kind == "Employee":
+                    payroll_rows.append({"id": len(payroll_rows) + 1, "transaction_id": txn_id})
+                    payrolls.setdefault(rel_id, []).append(len(payroll_rows))
+                elif kind == "Supplier":
+                    payment_rows.append({"id": len(payment_rows) + 1, "transaction_id": txn_id})
+                    supply_payments.setdefault(rel_id, []).append(len(payment_rows))
+            batched_insert(conn, Transaction.__table__, txn_rows)
+            batched_insert(conn, Payroll.__table__, payroll_rows)
+            batched_insert(conn, SupplyPayment.__table__, payment_rows)
+            del txn_rows, payroll_rows, payment_rows
+
+            def worklogs():
+                for _ in range(args.worklogs):
+                    rel_id = rng.choice(by_kind["Employee"])
+                    work_type_id, rate = rng.choice(work_types)
+                    units = rng.randint(1, 10)
+                    start = some_day()
+                    paid = start < paid_before and rel_id in payrolls
+                    yield {
+                        "start_date": start, "end_date": start + timedelta(days=rng.randrange(3)),
+                        "work_type_id": work_type_id, "relationship_id": rel_id,
+                        "work_units": units, "due_payment": units * rate,
+                        "payroll_id": rng.choice(payrolls[rel_id]) if paid else None,
+                        "description": None,
+                    }
+            batched_insert(conn, WorkLog.__table__, worklogs())
+
+            def supply_logs():
+                for _ in range(args.supply_logs):
+                    rel_id = rng.choice(by_kind["Supplier"])
+                    unit_price = round(rng.uniform(10, 1000), 2)
+                    units = rng.randint(1, 100)
+                    day = some_day()
+                    paid = day < paid_before and rel_id in supply_payments
+                    yield {
+                        "date": day, "supplier_id": rel_id, "supply_type_id": rng.choice(leaves),
+                        "unit_price": unit_price, "units": units, "amount": unit_price * units,
+                        "payment_id": rng.choice(supply_payments[rel_id]) if paid else None,
+                        "description": None,
+                    }
+            batched_insert(conn, SupplyLog.__table__, supply_logs())
+
+        rebuild_ledger_daily()
+        rebuild_supply_type_closure()
+        rebuild_relationship_balances()
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+
+    print(
+        f"Wrote {args.entities} entities, {args.transactions} transactions, {args.worklogs} work logs, "
+        f"{args.supply_logs} supply logs and {len(supply_types)} supply types to {args.path} "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
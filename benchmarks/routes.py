@@ -0,0 +1,169 @@
+"""Latency, query count and memory benchmark for the hot routes.
+
+Runs each route through the Flask test client against a database made by
+benchmarks/generate_data.py and reports p50/p95/p99 latency, SQL
+statements per request and peak Python memory per request.
+
+    python benchmarks/routes.py /tmp/bench.db --output baseline.json
+    python benchmarks/routes.py /tmp/bench.db --compare baseline.json
+
+With --compare the run exits non-zero when any route's p95 latency or
+query count grew by more than --threshold (default 20%) over the saved
+baseline. The dashboard summary cache is off by default so every request
+measures the real query; pass --dashboard-cache to leave it on.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.core.database import db  # noqa: E402
+from app.models import Relationship, Transaction, WorkLog  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def scenarios(app):
+    """(name, method, url, form) for each benchmarked request."""
+    with app.app_context():
+        busiest_entity = db.session.execute(
+            db.select(Relationship.entity_id)
+            .join(Transaction, Transaction.relationship_id == Relationship.id)
+            .group_by(Relationship.entity_id)
+            .order_by(db.func.count().desc())
+            .limit(1)
+        ).scalar() or 1
+        most_unpaid = db.session.execute(
+            db.select(WorkLog.relationship_id)
+            .where(WorkLog.payroll_id.is_(None))
+            .group_by(WorkLog.relationship_id)
+            .order_by(db.func.count().desc())
+            .limit(1)
+        ).scalar() or 1
+        first_day, last_day = db.session.execute(
+            db.select(db.func.min(Transaction.date), db.func.max(Transaction.date))
+        ).one()
+
+    return [
+        ("transactions", "GET", "/transactions", None),
+        ("worklogs", "GET", "/worklogs", None),
+        ("supply_logs", "GET", "/supply_logs", None),
+        ("entity_info", "GET", f"/entity_info/{busiest_entity}", None),
+        ("dashboard", "GET", "/dashboard", None),
+        ("dashboard_all_years", "POST", "/dashboard",
+         {"start_date": str(first_day or ""), "end_date": str(last_day or "")}),
+        ("api_unpaid_worklogs", "GET", f"/api/unpaid_worklogs/{most_unpaid}", None),
+        ("report_payroll_all_years", "GET",
+         f"/api/reports/payroll_by_work_type?start_date={first_day or ''}&end_date={last_day or ''}", None),
+        ("report_supply_weekly", "GET", "/reports/supply_by_type?period=week", None),
+        ("report_top_counterparties_all_years", "GET",
+         f"/api/reports/top_counterparties?start_date={first_day or ''}&end_date={last_day or ''}", None),
+    ]
+
+
+def measure(app, client, method, url, form, requests, warmup):
+    statements = []
+
+    def count(*args):
+        statements[-1] += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for _ in range(warmup):
+            statements.append(0)
+            client.open(url, method=method, data=form)
+        statements.clear()
+
+        latencies, peaks = [], []
+        for _ in range(requests):
+            statements.append(0)
+            tracemalloc.start()
+            started = time.perf_counter()
+            response = client.open(url, method=method, data=form)
+            latencies.append((time.perf_counter() - started) * 1000)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+            if response.status_code >= 400:
+                raise SystemExit(f"{method} {url} returned {response.status_code}")
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    return {
+        "method": method,
+        "url": url,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries": max(statements),
+        "peak_kib": round(statistics.median(peaks), 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        for metric in ("p95_ms", "queries"):
+            if before[metric] and now[metric] > before[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {now[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="SQLite database made by generate_data.py")
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", action="append", help="benchmark just this route (repeatable)")
+    parser.add_argument("--dashboard-cache", action="store_true", help="leave the dashboard cache on")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    config = {"SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.abspath(args.path)}
+    if not args.dashboard_cache:
+        config["DASHBOARD_CACHE_TTL"] = 0
+    app = create_app(config)
+    client = app.test_client()
+
+    results = {}
+    print(f"{'route':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'peak KiB':>10}")
+    for name, method, url, form in scenarios(app):
+        if args.only and name not in args.only:
+            continue
+        result = results[name] = measure(app, client, method, url, form, args.requests, args.warmup)
+        print(f"{name:<22}{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+              f"{result['queries']:>9}{result['peak_kib']:>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Concurrent write benchmark for the SQLite engine profiles in app.core.database.
+
+Starts several worker processes (standing in for gunicorn workers) that
+hammer one scratch database with short read-then-write transactions, once
+per profile, and reports commit throughput and the "database is locked"
+error rate for each.
+
+    python benchmarks/sqlite_profile.py --workers 8 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SQLITE_PROFILES, configure_sqlite_engine, db  # noqa: E402
+from app.models import Transaction  # noqa: E402
+
+
+def make_engine(path, profile):
+    engine = create_engine(f"sqlite:///{path}", **SQLITE_PROFILES[profile]["engine_options"])
+    configure_sqlite_engine(engine, profile)
+    return engine
+
+
+def setup_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO relationship_type (id, name) VALUES (1, 'Employee')")
+        conn.exec_driver_sql("INSERT INTO transaction_type (id, name) VALUES (1, 'Payroll')")
+        conn.exec_driver_sql("INSERT INTO entity (id, name, email, phone) VALUES (1, 'Bench', 'bench@example.com', '0')")
+        conn.exec_driver_sql("INSERT INTO relationship (id, entity_id, relationship_type_id) VALUES (1, 1, 1)")
+    engine.dispose()
+
+
+def worker(path, profile, seconds, results):
+    engine = make_engine(path, profile)
+    table = Transaction.__table__
+    commits = locked = other_errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            with engine.begin() as conn:
+                # read first, like a form post that looks things up before writing
+                conn.execute(select(func.count()).select_from(table).where(table.c.relationship_id == 1)).scalar()
+                conn.execute(table.insert().values(
+                    transaction_type_id=1, relationship_id=1, amount=1.0, date=date.today()
+                ))
+            commits += 1
+        except OperationalError as exc:
+            if "locked" in str(exc) or "busy" in str(exc):
+                locked += 1
+            else:
+                other_errors += 1
+    engine.dispose()
+    results.put((commits, locked, other_errors))
+
+
+def run(profile, workers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        setup_database(path)
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=worker, args=(path, profile, seconds, results))
+            for _ in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        totals = [sum(col) for col in zip(*(results.get() for _ in procs))]
+        for p in procs:
+            p.join()
+    commits, locked, other_errors = totals
+    attempts = commits + locked + other_errors
+    return {
+        "profile": profile,
+        "commits_per_sec": commits / seconds,
+        "lock_error_rate": locked / attempts if attempts else 0.0,
+        "commits": commits,
+        "lock_errors": locked,
+        "other_errors": other_errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--profiles", nargs="+", default=sorted(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'commits/s':>10} {'lock errors':>12} {'error rate':>11}")
+    for profile in args.profiles:
+        r = run(profile, args.workers, args.seconds)
+        print(f"{r['profile']:<12} {r['commits_per_sec']:>10.1f} {r['lock_errors']:>12} {r['lock_error_rate']:>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
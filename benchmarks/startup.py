@@ -0,0 +1,64 @@
+"""Import time and cold start to first response, each run in a fresh process.
+
+    python benchmarks/startup.py /tmp/bench.db --runs 10
+
+Each run starts a new interpreter, imports the app package, calls create_app() and
+serves one request through the test client, reporting how long each stage
+took since interpreter start. Median and worst case over --runs are
+printed; pass --url to time a different first request.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from app import create_app
+imported = time.perf_counter()
+app = create_app({"SQLALCHEMY_DATABASE_URI": sys.argv[2]})
+created = time.perf_counter()
+response = app.test_client().get(sys.argv[3])
+served = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - started) * 1000,
+    "first_response_ms": (served - started) * 1000,
+}))
+"""
+
+
+def run_once(root, database_url, url):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, root, database_url, url],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="SQLite database made by generate_data.py")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--url", default="/transactions")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    database_url = "sqlite:///" + os.path.abspath(args.path)
+    samples = [run_once(root, database_url, args.url) for _ in range(args.runs)]
+    if any(s["status"] >= 400 for s in samples):
+        raise SystemExit(f"GET {args.url} returned {samples[0]['status']}")
+
+    print(f"{'stage':<20}{'median ms':>11}{'max ms':>9}")
+    for stage in ("import_ms", "create_app_ms", "first_response_ms"):
+        values = [s[stage] for s in samples]
+        print(f"{stage[:-3]:<20}{statistics.median(values):>11.1f}{max(values):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 rm instance/*.db 
-rm -rf migrations
-flask db init
-flask db migrate -m "fresh start"
+# Rebuild from the committed migration history: it carries hand-written steps
+# (FTS tables and triggers, backfills) that autogenerate cannot reproduce
 flask db upgrade
+flask seed
@@ -0,0 +1,42 @@
+"""add ledger_daily rollup
+
+Revision ID: 7c1e4b2a9d30
+Revises: 298f99ca5c87
+Create Date: 2026-10-16 21:02:11.408215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4b2a9d30'
+down_revision = '298f99ca5c87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ledger_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('transaction_type_id', sa.Integer(), nullable=False),
+    sa.Column('relationship_type_id', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['relationship_type_id'], ['relationship_type.id'], ),
+    sa.ForeignKeyConstraint(['transaction_type_id'], ['transaction_type.id'], ),
+    sa.PrimaryKeyConstraint('day', 'transaction_type_id', 'relationship_type_id')
+    )
+
+    # Backfill from existing transactions
+    op.execute(
+        'INSERT INTO ledger_daily '
+        '(day, transaction_type_id, relationship_type_id, total_amount, transaction_count) '
+        'SELECT t.date, t.transaction_type_id, r.relationship_type_id, SUM(t.amount), COUNT(t.id) '
+        'FROM "transaction" t JOIN relationship r ON t.relationship_id = r.id '
+        'GROUP BY t.date, t.transaction_type_id, r.relationship_type_id'
+    )
+
+
+def downgrade():
+    op.drop_table('ledger_daily')
@@ -0,0 +1,47 @@
+"""add supply_type_closure
+
+Revision ID: a41f0c6e8b52
+Revises: 7c1e4b2a9d30
+Create Date: 2026-10-16 21:40:37.127544
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f0c6e8b52'
+down_revision = '7c1e4b2a9d30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('supply_type_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['supply_type.id'], ),
+    sa.ForeignKeyConstraint(['descendant_id'], ['supply_type.id'], ),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    with op.batch_alter_table('supply_type_closure', schema=None) as batch_op:
+        batch_op.create_index('ix_supply_type_closure_descendant', ['descendant_id', 'ancestor_id'], unique=False)
+
+    # Backfill from the existing parent_id tree
+    op.execute(
+        'INSERT INTO supply_type_closure (ancestor_id, descendant_id, depth) '
+        'WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS ('
+        '  SELECT id, id, 0 FROM supply_type'
+        '  UNION ALL'
+        '  SELECT tree.ancestor_id, child.id, tree.depth + 1'
+        '  FROM tree JOIN supply_type child ON child.parent_id = tree.descendant_id'
+        ') SELECT ancestor_id, descendant_id, depth FROM tree'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('supply_type_closure', schema=None) as batch_op:
+        batch_op.drop_index('ix_supply_type_closure_descendant')
+
+    op.drop_table('supply_type_closure')
@@ -0,0 +1,28 @@
+"""add table_version
+
+Revision ID: a8e3f7c1d294
+Revises: e6b4a2c97d15
+Create Date: 2026-10-17 00:37:48.519204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e3f7c1d294'
+down_revision = 'e6b4a2c97d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_version',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_version')
@@ -0,0 +1,53 @@
+"""add FTS5 search indexes
+
+Revision ID: b7d2e5f19c43
+Revises: a41f0c6e8b52
+Create Date: 2026-10-16 22:05:12.418302
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e5f19c43'
+down_revision = 'a41f0c6e8b52'
+branch_labels = None
+depends_on = None
+
+
+# External-content FTS5 indexes and the triggers that keep them in sync;
+# mirrors SEARCH_INDEXES / search_index_ddl() in app/core/search.py.
+SEARCH_INDEXES = [
+    ('entity', ['name', 'email', 'phone', 'address']),
+    ('transaction', ['description']),
+    ('work_log', ['description']),
+    ('supply_log', ['description']),
+]
+
+
+def upgrade():
+    for table, columns in SEARCH_INDEXES:
+        fts = f'{table}_fts'
+        cols = ', '.join(columns)
+        new = ', '.join(f'new.{c}' for c in columns)
+        old = ', '.join(f'old.{c}' for c in columns)
+        delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+        insert_new = f'INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});'
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute(f'CREATE TRIGGER {fts}_ai AFTER INSERT ON "{table}" BEGIN {insert_new} END')
+        op.execute(f'CREATE TRIGGER {fts}_ad AFTER DELETE ON "{table}" BEGIN {delete_old} END')
+        op.execute(f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON "{table}" BEGIN {delete_old} {insert_new} END')
+
+        # Index the existing rows
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    for table, _ in reversed(SEARCH_INDEXES):
+        fts = f'{table}_fts'
+        for suffix in ('au', 'ad', 'ai'):
+            op.execute(f'DROP TRIGGER {fts}_{suffix}')
+        op.execute(f'DROP TABLE {fts}')
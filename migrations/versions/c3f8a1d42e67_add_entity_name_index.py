@@ -0,0 +1,26 @@
+"""add entity name index for typeahead lookups
+
+Revision ID: c3f8a1d42e67
+Revises: b7d2e5f19c43
+Create Date: 2026-10-16 22:31:48.902215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1d42e67'
+down_revision = 'b7d2e5f19c43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('entity', schema=None) as batch_op:
+        batch_op.create_index('ix_entity_name_nocase', [sa.text('name COLLATE "NOCASE"')], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('entity', schema=None) as batch_op:
+        batch_op.drop_index('ix_entity_name_nocase')
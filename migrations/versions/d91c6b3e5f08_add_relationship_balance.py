@@ -0,0 +1,62 @@
+"""add relationship_balance
+
+Revision ID: d91c6b3e5f08
+Revises: c3f8a1d42e67
+Create Date: 2026-10-16 22:58:03.551876
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91c6b3e5f08'
+down_revision = 'c3f8a1d42e67'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('relationship_balance',
+    sa.Column('relationship_id', sa.Integer(), nullable=False),
+    sa.Column('unpaid_worklog_total', sa.Float(), nullable=False),
+    sa.Column('unpaid_worklog_count', sa.Integer(), nullable=False),
+    sa.Column('unpaid_supply_total', sa.Float(), nullable=False),
+    sa.Column('unpaid_supply_count', sa.Integer(), nullable=False),
+    sa.Column('paid_total', sa.Float(), nullable=False),
+    sa.Column('last_activity', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['relationship_id'], ['relationship.id'], ),
+    sa.PrimaryKeyConstraint('relationship_id')
+    )
+
+    # Backfill from the existing logs and transactions
+    op.execute(
+        'INSERT INTO relationship_balance (relationship_id, unpaid_worklog_total, unpaid_worklog_count, '
+        '  unpaid_supply_total, unpaid_supply_count, paid_total, last_activity) '
+        'SELECT c.relationship_id, SUM(c.unpaid_worklog_total), SUM(c.unpaid_worklog_count), '
+        '  SUM(c.unpaid_supply_total), SUM(c.unpaid_supply_count), SUM(c.paid_total), MAX(c.day) '
+        'FROM ('
+        '  SELECT relationship_id, '
+        '    CASE WHEN payroll_id IS NULL THEN due_payment ELSE 0.0 END AS unpaid_worklog_total, '
+        '    CASE WHEN payroll_id IS NULL THEN 1 ELSE 0 END AS unpaid_worklog_count, '
+        '    0.0 AS unpaid_supply_total, 0 AS unpaid_supply_count, '
+        '    CASE WHEN payroll_id IS NULL THEN 0.0 ELSE due_payment END AS paid_total, '
+        '    end_date AS day '
+        '  FROM work_log '
+        '  UNION ALL '
+        '  SELECT supplier_id, 0.0, 0, '
+        '    CASE WHEN payment_id IS NULL THEN amount ELSE 0.0 END, '
+        '    CASE WHEN payment_id IS NULL THEN 1 ELSE 0 END, '
+        '    CASE WHEN payment_id IS NULL THEN 0.0 ELSE amount END, '
+        '    date '
+        '  FROM supply_log '
+        '  UNION ALL '
+        '  SELECT relationship_id, 0.0, 0, 0.0, 0, 0.0, date FROM "transaction"'
+        ') AS c '
+        'JOIN relationship ON relationship.id = c.relationship_id '
+        'GROUP BY c.relationship_id'
+    )
+
+
+def downgrade():
+    op.drop_table('relationship_balance')
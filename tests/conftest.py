@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from app.core.database import db  # noqa: E402
+from app.core.rollups import (  # noqa: E402
+    BALANCE_COUNTERS, rebuild_ledger_daily, rebuild_relationship_balances,
+)
+from app.models import LedgerDaily, RelationshipBalance  # noqa: E402
+
+
+def rollup_rows():
+    """ledger_daily and relationship_balance counters, without the all-zero rows a rebuild drops.
+
+    last_activity is left out: deletes don't move it back until a rebuild.
+    """
+    ledger = LedgerDaily.__table__
+    balance = RelationshipBalance.__table__
+    ledger_rows = {
+        (row.day, row.transaction_type_id, row.relationship_type_id):
+            (round(row.total_amount, 2), row.transaction_count)
+        for row in db.session.execute(db.select(ledger))
+        if row.total_amount or row.transaction_count
+    }
+    balance_rows = {
+        row.relationship_id: tuple(round(row[name], 2) for name in BALANCE_COUNTERS)
+        for row in db.session.execute(db.select(balance)).mappings()
+    }
+    return ledger_rows, {key: counters for key, counters in balance_rows.items() if any(counters)}
+
+
+@pytest.fixture
+def check_rollups():
+    """Call inside an app context to assert the incremental rollups equal a rebuild from scratch."""
+    def check():
+        kept = rollup_rows()
+        rebuild_ledger_daily()
+        rebuild_relationship_balances()
+        assert kept == rollup_rows()
+    return check
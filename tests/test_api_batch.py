@@ -0,0 +1,75 @@
+import pytest
+
+from app import api_v1, create_app
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.seed import seed_defaults
+from app.models import Entity, Relationship, RelationshipType, WorkLog, WorkType
+
+
+@pytest.fixture
+def app():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+        employee = reference_data.by_name(RelationshipType, "Employee")
+        db.session.add(Relationship(
+            entity=Entity(name="ann", email="ann@example.com", phone="1"), relationship_type_id=employee.id
+        ))
+        db.session.commit()
+    return app
+
+
+def worklog(**overrides):
+    record = {"start_date": "2025-01-02", "end_date": "2025-01-02", "relationship_id": 1,
+              "work_type_id": 1, "work_units": 3}
+    return dict(record, **overrides)
+
+
+def test_batch_reports_an_error_per_failing_record(app):
+    response = app.test_client().post("/api/v1/entities", json=[
+        {"name": "bob", "email": "bob@example.com", "phone": "2"},
+        "not a record",
+        {"name": "cat", "phone": "3"},
+        {"name": "dan", "email": "ann@example.com", "phone": "4"},
+        {"name": "bob again", "email": "bob@example.com", "phone": "5"},
+    ])
+    assert response.status_code == 422
+    assert response.get_json() == {"created": 0, "results": [
+        {"index": 1, "status": "error", "error": "record must be a JSON object"},
+        {"index": 2, "status": "error", "error": "email is required"},
+        {"index": 3, "status": "error", "error": "email 'ann@example.com' is already in use"},
+        {"index": 4, "status": "error", "error": "email 'bob@example.com' is already in use"},
+    ]}
+    with app.app_context():
+        assert [e.name for e in Entity.query] == ["ann"]
+
+
+def test_batch_is_all_or_nothing(app, check_rollups, monkeypatch):
+    client = app.test_client()
+    response = client.post("/api/v1/worklogs", json={"items": [worklog(), worklog(work_type_id=999)]})
+    assert response.status_code == 422
+    assert response.get_json()["results"] == [
+        {"index": 1, "status": "error", "error": "unknown work_type_id 999"},
+    ]
+
+    # A failure after the rows are inserted rolls all of them back too
+    def fail(model, values):
+        raise RuntimeError("rollup update failed")
+    monkeypatch.setattr(api_v1, "record_core_insert", fail)
+    assert client.post("/api/v1/worklogs", json=[worklog(), worklog()]).status_code == 500
+    monkeypatch.undo()
+    with app.app_context():
+        assert WorkLog.query.count() == 0
+
+    response = client.post("/api/v1/worklogs", json=[worklog(), worklog(start_date="2025-01-01")])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 2
+    with app.app_context():
+        rate = db.session.get(WorkType, 1).rate
+        logs = {log.id: log for log in WorkLog.query}
+        assert [r["id"] for r in body["results"]] == sorted(logs)
+        assert all(log.due_payment == rate * 3 for log in logs.values())
+        check_rollups()
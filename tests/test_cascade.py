@@ -0,0 +1,82 @@
+from datetime import date
+
+from sqlalchemy import func, text
+
+from app import create_app
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.payments import run_payroll, run_supply_payments
+from app.core.seed import seed_defaults
+from app.models import (
+    Entity, Job, Payroll, Relationship, RelationshipType, SupplyLog, SupplyPayment, SupplyType, Transaction,
+    TransactionType, WorkLog, WorkType,
+)
+
+
+def add_entity(name, employee, supplier, work_type, supply_type, days=3):
+    """An entity that is both employee and supplier, with a work log and a supply log per day."""
+    entity = Entity(name=name, email=f"{name}@example.com", phone=name)
+    staff = Relationship(entity=entity, relationship_type_id=employee.id)
+    supply = Relationship(entity=entity, relationship_type_id=supplier.id)
+    db.session.add_all([entity, staff, supply])
+    for day in range(1, days + 1):
+        db.session.add_all([
+            WorkLog(start_date=date(2025, 1, day), end_date=date(2025, 1, day), work_type=work_type,
+                    relationship=staff, work_units=1, due_payment=10.0 * day),
+            SupplyLog(date=date(2025, 1, day), supplier=supply, supply_type=supply_type,
+                      unit_price=5, units=day, amount=5.0 * day),
+        ])
+    return entity
+
+
+def row_counts():
+    return {
+        model.__tablename__: db.session.scalar(db.select(func.count()).select_from(model))
+        for model in (Entity, Relationship, Transaction, Payroll, SupplyPayment, WorkLog, SupplyLog)
+    }
+
+
+def test_force_delete_entity_with_paid_logs(check_rollups):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite://", "JOB_WORKERS": 0,
+        "CASCADE_DELETE_CHUNK": 2, "CASCADE_DELETE_PAUSE": 0,
+    })
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+        employee = reference_data.by_name(RelationshipType, "Employee")
+        supplier = reference_data.by_name(RelationshipType, "Supplier")
+        work_type, supply_type = WorkType.query.first(), SupplyType(name="Seed")
+        ann = add_entity("ann", employee, supplier, work_type, supply_type)
+        add_entity("bob", employee, supplier, work_type, supply_type)
+        db.session.commit()
+        ann_id = ann.id
+        # Pay the first two days for both; ann's third day stays unpaid
+        run_payroll(date(2025, 1, 1), date(2025, 1, 2))
+        run_supply_payments(date(2025, 1, 1), date(2025, 1, 2))
+        db.session.add(Transaction(
+            transaction_type_id=reference_data.by_name(TransactionType, "Payroll").id,
+            relationship_id=Relationship.query.filter_by(entity_id=ann_id).first().id, amount=7,
+        ))
+        db.session.commit()
+        before = row_counts()
+
+    response = app.test_client().post(f"/force_delete_entity/{ann_id}")
+    assert response.status_code == 202
+
+    with app.app_context():
+        job = db.session.get(Job, response.get_json()["id"])
+        assert job.status == "succeeded"
+        assert job.result_data["entity"] == 1
+        assert row_counts() == {
+            "entity": before["entity"] - 1,
+            "relationship": before["relationship"] - 2,
+            "transaction": before["transaction"] - 3,  # payroll, supply payment, manual
+            "payroll": before["payroll"] - 1,
+            "supply_payment": before["supply_payment"] - 1,
+            "work_log": before["work_log"] - 3,
+            "supply_log": before["supply_log"] - 3,
+        }
+        assert db.session.execute(text("PRAGMA foreign_key_check")).all() == []
+        assert Entity.query.one().name == "bob"
+        check_rollups()
@@ -0,0 +1,34 @@
+from app import create_app
+from app.core.database import db
+from app.core.seed import seed_defaults
+
+
+def test_in_memory_database():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+    assert app.test_client().get("/dashboard").status_code == 200
+
+
+def test_file_database_gets_pool_options(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'pooled.db'}"})
+    with app.app_context():
+        assert db.engine.pool.size() == 5
+
+
+def test_apps_do_not_share_state():
+    first = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "JOB_WORKERS": 1, "DASHBOARD_CACHE_SIZE": 8})
+    second = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "JOB_WORKERS": 3, "DASHBOARD_CACHE_SIZE": 16})
+    for name in ("reference_data", "dashboard_cache", "request_metrics", "job_executor"):
+        assert first.extensions[name] is not second.extensions[name], name
+    assert first.extensions["job_executor"]._max_workers == 1
+    assert second.extensions["job_executor"]._max_workers == 3
+    assert second.extensions["dashboard_cache"].maxsize == 16
+
+    with first.app_context():
+        db.create_all()
+        seed_defaults()
+    first.test_client().get("/dashboard")
+    assert first.extensions["dashboard_cache"].stats()["misses"] > 0
+    assert second.extensions["dashboard_cache"].stats()["misses"] == 0
@@ -0,0 +1,95 @@
+import csv
+
+import pytest
+
+from app import create_app
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.seed import seed_defaults
+from app.models import Entity, Relationship, RelationshipType, SupplyLog, SupplyType, Transaction, WorkLog
+
+# Run with --batch-size 2, so good and bad rows share batches, one batch is
+# all rejects and the last batch is short
+CASES = {
+    "worklogs": (WorkLog, [
+        "start_date,end_date,employee,work_type,work_units,description",
+        "2025-01-01,2025-01-01,ann,Labour,1,first",
+        "2025-01-02,2025-01-02,nobody,Labour,1,unknown employee",
+        "2025-01-03,2025-01-03,dup,Labour,1,ambiguous employee",
+        "2025-01-04,2025-01-04,ann,Juggler,1,unknown work type",
+        "2025-01-05,2025-01-04,ann,Labour,1,ends before it starts",
+        "2025-01-06,2025-01-06,ann,Mason,2,second",
+        "2025-01-07,2025-01-07,ann,Labour,,missing units",
+    ], [
+        ("unknown employee", "unknown employee ('nobody', 'Employee')"),
+        ("ambiguous employee", "ambiguous employee ('dup', 'Employee')"),
+        ("unknown work type", "unknown work type 'Juggler'"),
+        ("ends before it starts", "end_date is before start_date"),
+        ("missing units", "missing work_units"),
+    ]),
+    "supply_logs": (SupplyLog, [
+        "date,supplier,supply_type,unit_price,units,description",
+        "2025-01-01,ann,Seed,5,2,first",
+        "2025-01-02,nobody,Seed,5,2,unknown supplier",
+        "2025-01-03,ann,Gravel,5,2,unknown supply type",
+        "2025-01-04,ann,Seed,five,2,bad price",
+        "2025-13-05,ann,Seed,5,2,bad date",
+        "2025-01-06,ann,Seed,5,3,second",
+    ], [
+        ("unknown supplier", "unknown supplier ('nobody', 'Supplier')"),
+        ("unknown supply type", "unknown supply type 'Gravel'"),
+        ("bad price", "unit_price must be a number"),
+        ("bad date", "date must be a YYYY-MM-DD date"),
+    ]),
+    "transactions": (Transaction, [
+        "date,transaction_type,entity,relationship_type,amount,description",
+        "2025-01-01,Supply Payments,ann,Supplier,10,first",
+        "2025-01-02,Refund,ann,Supplier,10,unknown transaction type",
+        "2025-01-03,Supply Payments,ann,Customer,10,unknown relationship",
+        "2025-01-04,Payroll,ann,Employee,10,payroll",
+        "2025-01-05,Supply Payments,ann,Supplier,12,second",
+    ], [
+        ("unknown transaction type", "unknown transaction type 'Refund'"),
+        ("unknown relationship", "unknown relationship ('ann', 'Customer')"),
+        ("payroll", "Payroll transactions are created by paying work logs"),
+    ]),
+}
+
+
+@pytest.mark.parametrize("kind", sorted(CASES))
+def test_import_writes_rejects_per_bad_row(kind, tmp_path, check_rollups):
+    model, lines, expected_rejects = CASES[kind]
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+        employee = reference_data.by_name(RelationshipType, "Employee")
+        supplier = reference_data.by_name(RelationshipType, "Supplier")
+        ann = Entity(name="ann", email="ann@example.com", phone="1")
+        dups = [Entity(name="dup", email=f"dup{i}@example.com", phone=f"2{i}") for i in range(2)]
+        db.session.add_all([
+            Relationship(entity=ann, relationship_type_id=employee.id),
+            Relationship(entity=ann, relationship_type_id=supplier.id),
+            *[Relationship(entity=dup, relationship_type_id=employee.id) for dup in dups],
+            SupplyType(name="Seed"),
+        ])
+        db.session.commit()
+
+    csv_path = tmp_path / f"{kind}.csv"
+    csv_path.write_text("\n".join(lines) + "\n")
+    rejects_path = tmp_path / "rejects.csv"
+    result = app.test_cli_runner().invoke(args=[
+        "import", kind, str(csv_path), "--rejects", str(rejects_path), "--batch-size", "2",
+    ])
+    assert result.exit_code == 0, result.output
+
+    imported = len(lines) - 1 - len(expected_rejects)
+    assert f"Imported {imported} {kind}; {len(expected_rejects)} rejected" in result.output
+    with rejects_path.open(newline="") as rejects_file:
+        rejects = list(csv.DictReader(rejects_file))
+    assert [(row["description"], row["error"]) for row in rejects] == expected_rejects
+    assert list(rejects[0]) == lines[0].split(",") + ["error"]
+
+    with app.app_context():
+        assert sorted(row.description for row in model.query) == ["first", "second"]
+        check_rollups()
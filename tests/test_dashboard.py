@@ -0,0 +1,39 @@
+from datetime import date
+
+from app import create_app
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.seed import seed_defaults
+from app.models import Entity, Relationship, RelationshipType, Transaction, TransactionType
+
+
+def test_new_and_moved_transactions_with_a_cached_range():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+        employee = reference_data.by_name(RelationshipType, "Employee")
+        relationship = Relationship(
+            entity=Entity(name="Ann", email="ann@example.com", phone="1"), relationship_type_id=employee.id
+        )
+        db.session.add(relationship)
+        db.session.commit()
+        relationship_id = relationship.id
+        type_id = reference_data.by_name(TransactionType, "Payroll").id
+
+    client = app.test_client()
+    january = {"start_date": "2025-01-01", "end_date": "2025-02-01"}
+    assert client.post("/dashboard", data=january).status_code == 200
+    response = client.post("/add_transaction", data={
+        "transaction_type_id": type_id, "relationship_id": relationship_id, "amount": "5",
+    })
+    assert response.status_code == 302
+
+    assert b"Payroll" in client.get("/dashboard").data
+
+    with app.app_context():
+        transaction = db.session.execute(db.select(Transaction)).scalar_one()
+        db.session.commit()
+        transaction.date = date(2025, 1, 15)  # set on an expired instance
+        db.session.commit()
+    assert b"Payroll" in client.post("/dashboard", data=january).data
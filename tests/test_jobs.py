@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.core.database import db
+from app.models import Job
+
+
+def test_abandoned_jobs_are_failed():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "JOB_STALE_AFTER": 60})
+    old = datetime.utcnow() - timedelta(minutes=5)
+    with app.app_context():
+        db.create_all()
+        jobs = [
+            Job(kind="payroll_run", status="running", created_at=old, started_at=old),
+            Job(kind="payroll_run", status="queued", created_at=old),
+            Job(kind="payroll_run", status="running", started_at=datetime.utcnow()),
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+        stale_running, stale_queued, live = (job.id for job in jobs)
+
+    client = app.test_client()
+    assert client.get(f"/api/jobs/{stale_running}").get_json()["status"] == "failed"
+    assert client.get("/jobs").status_code == 200
+    with app.app_context():
+        statuses = {job.id: job.status for job in Job.query}
+    assert statuses == {stale_running: "failed", stale_queued: "failed", live: "running"}
@@ -0,0 +1,16 @@
+import os
+
+from flask_migrate import upgrade
+
+from app import create_app
+from app.core.database import db
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def test_upgrade_fresh_database(tmp_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'fresh.db'}"})
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        tables = set(db.inspect(db.engine).get_table_names())
+    assert {"table_version", "job", "entity_fts", "alembic_version"} <= tables
@@ -0,0 +1,192 @@
+from datetime import date
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from sqlalchemy import and_, func
+
+from app import api_v1, create_app
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.seed import seed_defaults
+from app.models import (
+    Entity, Job, Payroll, Relationship, RelationshipType, SupplyLog, SupplyPayment, SupplyType, Transaction,
+    TransactionType, WorkLog, WorkType,
+)
+
+
+@pytest.fixture
+def app():
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "JOB_WORKERS": 0})
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+    return app
+
+
+def add_suppliers(names, logs_each=2, amount=20):
+    """One supplier relationship per name with `logs_each` unpaid supply logs; returns {name: (id, log ids)}."""
+    supplier = reference_data.by_name(RelationshipType, "Supplier")
+    supply_type = SupplyType(name="Seed")
+    suppliers = {}
+    for name in names:
+        relationship = Relationship(
+            entity=Entity(name=name, email=f"{name}@example.com", phone=name), relationship_type_id=supplier.id
+        )
+        logs = [
+            SupplyLog(date=date(2025, 1, day), supplier=relationship, supply_type=supply_type,
+                      unit_price=amount, units=1, amount=amount)
+            for day in range(1, logs_each + 1)
+        ]
+        db.session.add_all([relationship, *logs])
+        suppliers[name] = (relationship, logs)
+    db.session.commit()
+    return {name: (rel.id, [log.id for log in logs]) for name, (rel, logs) in suppliers.items()}
+
+
+def add_employees(names, logs_each=4):
+    """One employee relationship per name with a work log starting each day from 2025-01-01; returns {name: id}."""
+    employee = reference_data.by_name(RelationshipType, "Employee")
+    work_type = WorkType.query.first()
+    employees = {}
+    for name in names:
+        relationship = Relationship(
+            entity=Entity(name=name, email=f"{name}@example.com", phone=name), relationship_type_id=employee.id
+        )
+        db.session.add(relationship)
+        db.session.add_all(
+            WorkLog(start_date=date(2025, 1, day), end_date=date(2025, 1, day), work_type=work_type,
+                    relationship=relationship, work_units=day, due_payment=10.0 * day)
+            for day in range(1, logs_each + 1)
+        )
+        employees[name] = relationship
+    db.session.commit()
+    return {name: rel.id for name, rel in employees.items()}
+
+
+def payment_links(payment_model, paid_by, counterparty, amount, day):
+    """{counterparty id: (amount paid, sum of the logs linked to the payment, their days)} per payment."""
+    rows = db.session.execute(
+        db.select(Transaction.relationship_id, Transaction.amount, func.sum(amount), func.group_concat(day))
+        .join(payment_model, payment_model.transaction_id == Transaction.id)
+        .join(paid_by.class_, and_(paid_by == payment_model.id, counterparty == Transaction.relationship_id))
+        .group_by(Transaction.id)
+    ).all()
+    return {rel_id: (paid, due, sorted(days.split(","))) for rel_id, paid, due, days in rows}
+
+
+def payroll_links():
+    return payment_links(Payroll, WorkLog.payroll_id, WorkLog.relationship_id, WorkLog.due_payment,
+                         WorkLog.start_date)
+
+
+def supply_payment_links():
+    return payment_links(SupplyPayment, SupplyLog.payment_id, SupplyLog.supplier_id, SupplyLog.amount,
+                         SupplyLog.date)
+
+
+def paid_logs():
+    return sorted(db.session.scalars(db.select(SupplyLog.id).where(SupplyLog.payment_id.isnot(None))))
+
+
+def test_api_supply_payment_rejects_logs_it_cannot_pay(app, monkeypatch):
+    with app.app_context():
+        suppliers = add_suppliers(["ann", "bob"])
+    (ann, ann_logs), (_, bob_logs) = suppliers["ann"], suppliers["bob"]
+    client = app.test_client()
+
+    response = client.post("/api/v1/supply_payments", json={"supplier_id": ann, "supply_log_ids": ann_logs[:1]})
+    assert response.status_code == 201
+    assert response.get_json()["supply_logs"] == 1
+
+    for log_ids in (ann_logs, [ann_logs[1], bob_logs[0]]):  # one already paid / one of bob's
+        response = client.post("/api/v1/supply_payments", json={"supplier_id": ann, "supply_log_ids": log_ids})
+        assert response.status_code == 409
+
+    # Another run pays the logs between the check and the payment
+    monkeypatch.setattr(api_v1, "payable_supply_log_count", lambda supplier_id, log_ids: len(log_ids))
+    response = client.post("/api/v1/supply_payments", json={"supplier_id": ann, "supply_log_ids": ann_logs[:1]})
+    assert response.status_code == 409
+    with app.app_context():
+        assert paid_logs() == ann_logs[:1]
+
+
+def test_form_supply_payment_pays_all_selected_logs_or_none(app, check_rollups):
+    with app.app_context():
+        suppliers = add_suppliers(["ann", "bob"])
+        payment_type = reference_data.by_name(TransactionType, "Supply Payments").id
+    (ann, ann_logs), (_, bob_logs) = suppliers["ann"], suppliers["bob"]
+    client = app.test_client()
+
+    def pay(log_ids):
+        return client.post("/add_transaction", data={
+            "transaction_type_id": payment_type, "relationship_id": ann, "supply_logs": log_ids,
+        })
+
+    assert pay([ann_logs[0], bob_logs[0]]).status_code == 409
+    assert pay(ann_logs[:1]).status_code == 302
+    assert pay(ann_logs).status_code == 409
+    with app.app_context():
+        assert paid_logs() == ann_logs[:1]
+        assert supply_payment_links() == {ann: (20.0, 20.0, ["2025-01-01"])}
+        check_rollups()
+
+
+def run_job(client, url, **form):
+    """POST a payment run page and return the job it queued (run inline)."""
+    response = client.post(url, data=form)
+    assert response.status_code == 302
+    assert client.get(response.location).status_code == 200
+    return db.session.get(Job, int(parse_qs(urlparse(response.location).query)["job"][0]))
+
+
+def test_payroll_run_job_pays_the_window(app, check_rollups):
+    with app.app_context():
+        ann, bob, cat = add_employees(["ann", "bob", "cat"]).values()
+        client = app.test_client()
+
+        job = run_job(client, "/payroll_run", start_date="2025-01-02", end_date="2025-01-03",
+                      relationship_ids=[ann, bob])
+        assert job.status == "succeeded"
+        assert sorted((r["relationship_id"], r["worklogs"], r["amount"]) for r in job.result_data) == \
+            [(ann, 2, 50.0), (bob, 2, 50.0)]
+        window = ["2025-01-02", "2025-01-03"]
+        assert payroll_links() == {ann: (50.0, 50.0, window), bob: (50.0, 50.0, window)}
+        check_rollups()
+
+        # The window is paid: running it again pays nothing more
+        job = run_job(client, "/payroll_run", start_date="2025-01-01", end_date="2025-01-03",
+                      relationship_ids=[ann, bob, cat])
+        assert sorted((r["relationship_id"], r["worklogs"]) for r in job.result_data) == [(ann, 1), (bob, 1), (cat, 3)]
+        assert len(db.session.scalars(db.select(WorkLog).where(WorkLog.payroll_id.is_(None))).all()) == 3
+        check_rollups()
+
+
+def test_supply_payment_run_job_pays_the_window(app, check_rollups):
+    with app.app_context():
+        suppliers = add_suppliers(["ann", "bob"], logs_each=4)
+        (ann, _), (bob, _) = suppliers.values()
+        client = app.test_client()
+
+        job = run_job(client, "/supply_payment_run", start_date="2025-01-02", end_date="2025-01-03",
+                      supplier_ids=[ann])
+        assert job.status == "succeeded"
+        assert [(r["supplier_id"], r["supply_logs"], r["amount"]) for r in job.result_data] == [(ann, 2, 40.0)]
+        assert supply_payment_links() == {ann: (40.0, 40.0, ["2025-01-02", "2025-01-03"])}
+        assert len(db.session.scalars(db.select(SupplyLog).where(SupplyLog.supplier_id == bob,
+                                                                 SupplyLog.payment_id.isnot(None))).all()) == 0
+        check_rollups()
+
+
+def test_form_payroll_pays_the_selected_work_logs(app, check_rollups):
+    with app.app_context():
+        ann = add_employees(["ann"])["ann"]
+        log_ids = db.session.scalars(
+            db.select(WorkLog.id).where(WorkLog.start_date.between(date(2025, 1, 2), date(2025, 1, 3)))
+        ).all()
+        payroll_type = reference_data.by_name(TransactionType, "Payroll").id
+        response = app.test_client().post("/add_transaction", data={
+            "transaction_type_id": payroll_type, "relationship_id": ann, "worklogs": log_ids,
+        })
+        assert response.status_code == 302
+        assert payroll_links() == {ann: (50.0, 50.0, ["2025-01-02", "2025-01-03"])}
+        check_rollups()
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.seed import seed_defaults
+from app.models import (
+    Entity, Payroll, Relationship, RelationshipType, SupplyLog, SupplyPayment, SupplyType, Transaction,
+    TransactionType, WorkLog, WorkType,
+)
+
+PAGES = ["/transactions", "/worklogs", "/supply_logs", "/entities", "/relationships", "/dashboard"]
+
+
+def populate(size):
+    """`size` of each kind of row, with half the work and supply logs paid."""
+    seed_defaults()
+    employee = reference_data.by_name(RelationshipType, "Employee")
+    supplier = reference_data.by_name(RelationshipType, "Supplier")
+    payroll_type = reference_data.by_name(TransactionType, "Payroll")
+    supply_type_payment = reference_data.by_name(TransactionType, "Supply Payments")
+    work_types = WorkType.query.all()
+    root = SupplyType(name="Produce")
+    supply_types = [root] + [SupplyType(name=f"Produce {i}", parent=root) for i in range(3)]
+    db.session.add_all(supply_types)
+
+    today = date.today()
+    for i in range(size):
+        entity = Entity(name=f"Entity {i}", email=f"e{i}@example.com", phone=str(i))
+        employment = Relationship(entity=entity, relationship_type_id=employee.id)
+        supply = Relationship(entity=entity, relationship_type_id=supplier.id)
+        day = today - timedelta(days=i)
+        work_type = work_types[i % len(work_types)]
+        worklog = WorkLog(
+            start_date=day, end_date=day, work_type=work_type, relationship=employment,
+            work_units=1, due_payment=work_type.rate
+        )
+        supply_log = SupplyLog(
+            date=day, supplier=supply, supply_type=supply_types[i % len(supply_types)],
+            unit_price=10, units=2, amount=20
+        )
+        db.session.add_all([entity, employment, supply, worklog, supply_log])
+        db.session.add(Transaction(
+            transaction_type_id=payroll_type.id, relationship=employment, amount=100 + i, date=day
+        ))
+        if i % 2:
+            payment = Transaction(
+                transaction_type_id=payroll_type.id, relationship=employment, amount=worklog.due_payment, date=day
+            )
+            worklog.payroll = Payroll(transaction=payment)
+            supply_payment = Transaction(
+                transaction_type_id=supply_type_payment.id, relationship=supply, amount=20, date=day
+            )
+            supply_log.payment = SupplyPayment(transaction=supply_payment)
+    db.session.commit()
+
+
+def page_query_counts(tmp_path, size):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / f'size{size}.db'}"})
+    with app.app_context():
+        db.create_all()
+        populate(size)
+        engine = db.engine
+    client = app.test_client()
+
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    counts = {}
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for url in PAGES:
+            statements.clear()
+            response = client.get(url)
+            assert response.status_code == 200, url
+            counts[url] = len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return counts
+
+
+@pytest.fixture(scope="module")
+def counts(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("query_counts")
+    return page_query_counts(tmp_path, 4), page_query_counts(tmp_path, 40)
+
+
+@pytest.mark.parametrize("url", PAGES)
+def test_query_count_does_not_grow_with_rows(counts, url):
+    small, large = counts
+    assert large[url] == small[url]
@@ -0,0 +1,63 @@
+from datetime import date
+
+from app import create_app
+from app.core.caches import reference_data
+from app.core.database import db
+from app.core.seed import seed_defaults
+from app.models import (
+    Entity, Payroll, Relationship, RelationshipType, SupplyLog, SupplyPayment, SupplyType, Transaction,
+    TransactionType, WorkLog, WorkType,
+)
+
+
+def test_updates_and_deletes_of_committed_rows(check_rollups):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    with app.app_context():
+        db.create_all()
+        seed_defaults()
+        employee = reference_data.by_name(RelationshipType, "Employee")
+        supplier = reference_data.by_name(RelationshipType, "Supplier")
+        payroll_type = reference_data.by_name(TransactionType, "Payroll")
+        supply_type_payment = reference_data.by_name(TransactionType, "Supply Payments")
+        work_type = WorkType.query.first()
+        day = date(2025, 1, 10)
+
+        entities = [Entity(name=name, email=f"{name}@example.com", phone=name) for name in ("ann", "bob")]
+        staff = [Relationship(entity=e, relationship_type_id=employee.id) for e in entities]
+        suppliers = [Relationship(entity=e, relationship_type_id=supplier.id) for e in entities]
+        transaction = Transaction(transaction_type_id=payroll_type.id, relationship=staff[0], amount=50, date=day)
+        worklog = WorkLog(start_date=day, end_date=day, work_type=work_type, relationship=staff[0],
+                          work_units=1, due_payment=30)
+        supply_log = SupplyLog(date=day, supplier=suppliers[0], supply_type=SupplyType(name="Seed"),
+                               unit_price=5, units=4, amount=20)
+        payroll = Payroll(transaction=Transaction(
+            transaction_type_id=payroll_type.id, relationship=staff[1], amount=0, date=day
+        ))
+        supply_payment = SupplyPayment(transaction=Transaction(
+            transaction_type_id=supply_type_payment.id, relationship=suppliers[1], amount=0, date=day
+        ))
+        db.session.add_all(entities + staff + suppliers + [transaction, worklog, supply_log, payroll, supply_payment])
+        db.session.commit()
+        check_rollups()
+
+        # Each change is made on an instance expired by the previous commit
+        for obj, changes in (
+            (transaction, {"amount": 75}),
+            (transaction, {"date": date(2025, 2, 1), "transaction_type_id": supply_type_payment.id}),
+            (transaction, {"relationship_id": suppliers[1].id}),
+            (worklog, {"due_payment": 45}),
+            (worklog, {"relationship_id": staff[1].id}),
+            (worklog, {"payroll_id": payroll.id}),
+            (supply_log, {"amount": 25}),
+            (supply_log, {"supplier_id": suppliers[1].id}),
+            (supply_log, {"payment_id": supply_payment.id}),
+        ):
+            for attr, value in changes.items():
+                setattr(obj, attr, value)
+            db.session.commit()
+            check_rollups()
+
+        for obj in (transaction, worklog, supply_log):
+            db.session.delete(obj)
+            db.session.commit()
+            check_rollups()